@@ -0,0 +1,52 @@
+"""Memory of preprocessed frames with categorical keys against plain strings.
+
+Builds a synthetic TGRL file (one row per agent and code, 24 hours) and
+reports the deep memory usage of the preprocessed frame as returned and with
+its categorical columns converted back to Python strings.
+
+    python benchmarks/preprocess_memory.py --agents 300 --codes 40
+"""
+import argparse
+import io
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from asic.files.definitions.tgrl import TGRL
+
+HOURS = [f"HORA {h:02d}" for h in range(1, 25)]
+
+
+def synthetic_tgrl(agents: int, codes: int) -> io.BytesIO:
+    rng = np.random.default_rng(0)
+    lines = [";".join(["CODIGO", "AGENTE", "CONTENIDO", *HOURS])]
+    for c in range(codes):
+        for a in range(agents):
+            values = rng.random(24) * 1000
+            lines.append(
+                ";".join([f"C{c:03d}", f"AG{a:03d}", f"Contenido del codigo {c}", *map(str, values)])
+            )
+    return io.BytesIO("\n".join(lines).encode("cp1252"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=300)
+    parser.add_argument("--codes", type=int, default=40)
+    args = parser.parse_args()
+
+    tgrl = TGRL.from_remote_path(pathlib.PureWindowsPath("/RUTA/PUBLICA/DEL/FTP/2023-10/tgrl1001.tx2"))
+    long_data = tgrl.preprocess(synthetic_tgrl(args.agents, args.codes))
+    categorical = [c for c in long_data.columns if isinstance(long_data[c].dtype, pd.CategoricalDtype)]
+    as_objects = long_data.astype(dict.fromkeys(categorical, object))
+
+    with_categories = long_data.memory_usage(deep=True).sum()
+    with_strings = as_objects.memory_usage(deep=True).sum()
+    print(f"rows: {len(long_data)}, categorical columns: {categorical}")
+    print(f"strings:    {with_strings / 2**20:8.1f} MiB")
+    print(f"categories: {with_categories / 2**20:8.1f} MiB ({with_strings / with_categories:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
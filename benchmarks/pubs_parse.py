@@ -0,0 +1,70 @@
+"""Parsing the monthly publications page with `pd.read_html` against `read_html_table`.
+
+Uses a saved copy of the publications page (`--page`) or a synthetic page
+with the same layout: navigation tables around the versions table, one row
+per month.
+
+    python benchmarks/pubs_parse.py --page versionesliq.htm
+"""
+import argparse
+import pathlib
+import time
+import warnings
+from io import BytesIO
+
+import pandas as pd
+
+from asic.html_table import read_html_table
+from asic.publication import ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE
+
+SERVICE = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE
+
+
+def synthetic_page(months: int) -> bytes:
+    menu = "".join(f"<tr><td><a href='#'>Sección {i}</a></td></tr>" for i in range(40))
+    rows = []
+    for m in range(months):
+        year, month = divmod(m, 12)
+        cells = [f"{2000 + year}-{month + 1:02d}", *(f"{10 + d}/{month + 1:02d}/{2000 + year}" for d in range(6))]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    header = "<tr>" + "".join(f"<td><b>{h}</b></td>" for h in ["Mes", "TXR", "TX2", "TX3", "TX4", "TX5", "TXF"]) + "</tr>"
+    footer = "".join(f"<p>Nota {i}</p>" for i in range(200))
+    page = (
+        "<html><head><title>Versiones</title></head><body>"
+        f"<table>{menu}</table>"
+        f"<table border=1>{header}{''.join(rows)}</table>"
+        f"{footer}<table><tr><td>Pie de página</td></tr></table></body></html>"
+    )
+    return page.encode(SERVICE["encoding"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=pathlib.Path, help="Saved copy of the publications page")
+    parser.add_argument("--months", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = args.page.read_bytes() if args.page else synthetic_page(args.months)
+    index = SERVICE["table-index"]
+
+    # bs4 warns that the encoding is ignored once html5lib decoded the page
+    warnings.filterwarnings("ignore", category=UserWarning, module="bs4")
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        expected = pd.read_html(BytesIO(content), flavor="html5lib", encoding=SERVICE["encoding"])[index]
+    read_html_seconds = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        table = read_html_table(content, index, SERVICE["encoding"])
+    extractor_seconds = (time.perf_counter() - start) / args.repeat
+
+    pd.testing.assert_frame_equal(table, expected)
+    print(f"page: {len(content)} bytes, table {index} with {len(table)} rows")
+    print(f"pd.read_html:    {read_html_seconds:6.3f}s")
+    print(f"read_html_table: {extractor_seconds:6.3f}s ({read_html_seconds / extractor_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
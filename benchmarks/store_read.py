@@ -0,0 +1,74 @@
+"""Reading a year of TRSD prices from CSV files against the columnar store.
+
+Preprocesses a synthetic TRSD day, writes it for every day of a year both as
+the per file CSV output and into a `ColumnarStore`, and times loading the
+`FECHA_HORA` and `PRECIO` columns of the whole year back.
+
+    python benchmarks/store_read.py --days 365
+"""
+import argparse
+import io
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from asic.files.definitions.trsd import TRSD
+from asic.store import ColumnarStore
+
+HOURS = [f"HORA {h:02d}" for h in range(1, 25)]
+
+
+def synthetic_trsd(codes: int) -> io.BytesIO:
+    rng = np.random.default_rng(0)
+    lines = [";".join(["CODIGO", "CONTENIDO", *HOURS])]
+    for c in range(codes):
+        values = rng.random(24) * 1000
+        lines.append(";".join([f"C{c:03d}", f"Precio {c}", *map(str, values)]))
+    return io.BytesIO("\n".join(lines).encode("cp1252"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--codes", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        store = ColumnarStore(root / "columnar")
+        csv_dir = root / "csv"
+        csv_dir.mkdir()
+        day = pd.Timestamp(2023, 1, 1)
+        for _ in range(args.days):
+            remote = f"/RUTA/PUBLICA/DEL/FTP/{day:%Y-%m}/trsd{day:%m%d}.tx2"
+            trsd = TRSD.from_remote_path(pathlib.PureWindowsPath(remote))
+            frame = trsd.preprocess(synthetic_trsd(args.codes))
+            frame.to_csv(csv_dir / f"{day:%Y%m%d}.csv", index=False, encoding="utf-8-sig")
+            store.write(trsd, frame)
+            day += pd.Timedelta(days=1)
+
+        start = time.perf_counter()
+        from_csv = pd.concat(
+            [
+                pd.read_csv(p, usecols=["FECHA_HORA", "PRECIO"], parse_dates=["FECHA_HORA"], encoding="utf-8-sig")
+                for p in sorted(csv_dir.glob("*.csv"))
+            ],
+            ignore_index=True,
+        )
+        csv_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        from_store = store.read("trsd", year=2023, columns=["FECHA_HORA", "PRECIO"])
+        store_seconds = time.perf_counter() - start
+
+    assert len(from_csv) == len(from_store)
+    print(f"rows: {len(from_store)} in {args.days} files")
+    print(f"csv:      {csv_seconds:6.3f}s")
+    print(f"columnar: {store_seconds:6.3f}s ({csv_seconds / store_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
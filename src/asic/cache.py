@@ -0,0 +1,202 @@
+import contextlib
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import sqlite3
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = (
+    pathlib.Path(os.getenv("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")) / "asic"
+)
+
+LISTING_CACHE_FILENAME = "listings.sqlite3"
+
+CURRENT_MONTH_LISTING_TTL = dt.timedelta(hours=1)
+
+LOCATION_MONTH_REGEX = re.compile(
+    r"""
+    (?P<location_year>[0-9]{4})             # Year of the location directory
+    -                                       # Separator between year and month
+    (?P<location_month>[0-9]{2})            # Month of the location directory
+    """,
+    re.VERBOSE,
+)
+
+
+def location_month(location: str) -> dt.date | None:
+    """Return the month a location directory belongs to, if it has one."""
+    match = LOCATION_MONTH_REGEX.search(location)
+    if match is None:
+        return None
+    return dt.date(int(match["location_year"]), int(match["location_month"]), 1)
+
+
+class ListingCache:
+    """Persistent cache of FTP directory listings stored in SQLite.
+
+    Listings of locations belonging to a month before the current one are
+    treated as immutable and never expire. Any other location (the current
+    month, or a location without a month) is refreshed once its listing is
+    older than `current_month_ttl`.
+
+    Each listing records whether its entries are `detailed` (listed with
+    MLSD, with size and modification time) or only names (NLST), so a names
+    only listing never stands in for a detailed one.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        current_month_ttl: dt.timedelta = CURRENT_MONTH_LISTING_TTL,
+    ) -> None:
+        self.path = path
+        self.current_month_ttl = current_month_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    host TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    entries TEXT NOT NULL,
+                    detailed INTEGER NOT NULL,
+                    PRIMARY KEY (host, location)
+                )
+                """
+            )
+
+    @classmethod
+    def in_dir(cls, cache_dir: pathlib.Path, **kwargs) -> "ListingCache":
+        return cls(cache_dir / LISTING_CACHE_FILENAME, **kwargs)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        with contextlib.closing(sqlite3.connect(self.path)) as con:
+            with con:
+                yield con
+
+    def is_fresh(
+        self, location: str, fetched_at: dt.datetime, now: dt.datetime | None = None
+    ) -> bool:
+        now = now if now is not None else dt.datetime.now()
+        month = location_month(location)
+        if month is not None and month < now.date().replace(day=1):
+            return True
+        return now - fetched_at <= self.current_month_ttl
+
+    def get(
+        self, host: str, location: str, now: dt.datetime | None = None, detailed: bool = False
+    ) -> list[Any] | None:
+        """Return the cached entries of `location`, `None` if missing or stale.
+
+        With `detailed` a names only listing is a miss too.
+        """
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT fetched_at, entries, detailed FROM listings WHERE host = ? AND location = ?",
+                (host, location),
+            ).fetchone()
+        if row is None:
+            logger.debug(f"Listing cache miss for {location}")
+            return None
+        if detailed and not row[2]:
+            logger.debug(f"Listing cache for {location} has only names, listing it again")
+            return None
+        fetched_at = dt.datetime.fromisoformat(row[0])
+        if not self.is_fresh(location, fetched_at, now):
+            logger.debug(f"Listing cache expired for {location} (fetched at {fetched_at})")
+            return None
+        logger.debug(f"Listing cache hit for {location} (fetched at {fetched_at})")
+        return json.loads(row[1])
+
+    def put(
+        self,
+        host: str,
+        location: str,
+        entries: list[Any],
+        now: dt.datetime | None = None,
+        detailed: bool = False,
+    ) -> None:
+        fetched_at = now if now is not None else dt.datetime.now()
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO listings (host, location, fetched_at, entries, detailed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (host, location, fetched_at.isoformat(), json.dumps(entries), detailed),
+            )
+
+
+PAGE_CACHE_DIRNAME = "pages"
+
+
+class PageCache:
+    """On disk cache of fetched web pages, one JSON file per URL.
+
+    Each entry keeps the HTTP validators (`ETag`, `Last-Modified`) to
+    revalidate the page with a conditional request, the sha256 of the last
+    body and what was parsed out of it, so an unchanged page is neither
+    downloaded nor parsed again.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def in_dir(cls, cache_dir: pathlib.Path) -> "PageCache":
+        return cls(cache_dir / PAGE_CACHE_DIRNAME)
+
+    def _file(self, url: str) -> pathlib.Path:
+        return self.path / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.json"
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        try:
+            with open(self._file(url), encoding="utf-8") as cached:
+                entry = json.load(cached)
+        except FileNotFoundError:
+            logger.debug(f"Page cache miss for {url}")
+            return None
+        logger.debug(f"Page cache hit for {url} (fetched at {entry['fetched_at']})")
+        return entry
+
+    def put(
+        self,
+        url: str,
+        *,
+        etag: str | None,
+        last_modified: str | None,
+        content_sha256: str,
+        parsed: Any,
+        now: dt.datetime | None = None,
+    ) -> None:
+        entry = {
+            "url": url,
+            "fetched_at": (now if now is not None else dt.datetime.now()).isoformat(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_sha256": content_sha256,
+            "parsed": parsed,
+        }
+        # Written aside and renamed, pollers may read it at the same time
+        target = self._file(url)
+        partial = target.with_name(f"{target.name}.{os.getpid()}.part")
+        with open(partial, "w", encoding="utf-8") as out:
+            json.dump(entry, out, ensure_ascii=False)
+        os.replace(partial, target)
+
+    @staticmethod
+    def revalidation_headers(entry: dict[str, Any]) -> dict[str, str]:
+        """Conditional request headers for a cached `entry`."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
@@ -1,8 +1,12 @@
 import datetime as dt
+import ftplib
+import functools
+import io
+import itertools
 import logging
 import os
 import pathlib
-from typing import Optional
+from typing import Callable, Optional
 
 import pydantic
 import rich
@@ -11,14 +15,33 @@ import rich.progress
 import typer
 
 from asic import ASIC_FILE_CONFIG, ASIC_FILE_EXTENSION_MAP
+from asic.cache import DEFAULT_CACHE_DIR, ListingCache, PageCache
 from asic.config import ASICFileVisibility
 from asic.files.definitions import SUPPORTED_FILE_CLASSES
+from asic.files.file import AsicFile
 from asic.ftp import (
+    DownloadSpec,
+    FTPSessionPool,
     get_ftps,
-    grab_file,  # list_supported_files_in_location,
+    grab_spec,
+    grab_spec_to_memory,
+    is_local_copy_current,
+    keep_latest_versions,
     list_supported_files,
+    list_target_files,
+    probe_remote_files,
+    synthesize_supported_files,
 )
-from asic.publication import list_latest_published_versions
+from asic.processing import (
+    OutputFormat,
+    list_local_files,
+    mirror_path,
+    preprocess_file,
+    preprocessing_pool,
+    write_preprocessed,
+)
+from asic.publication import list_latest_published_versions, plan_publication_targets
+from asic.reader import NUMERIC_POLICY_ENVVAR, NumericPolicy
 
 logger = logging.getLogger("asic")
 logger.addHandler(rich.logging.RichHandler())
@@ -39,9 +62,22 @@ def main(
     verbosity: int = typer.Option(0, "--verbosity", "-v", count=True),
     ftps_host: str = typer.Option(default="xmftps.xm.com.co", envvar="ASIC_FTPS_HOST"),
     ftps_port: int = typer.Option(default=210, envvar="ASIC_FTPS_PORT"),
-    ftps_user: str = typer.Option(..., envvar="ASIC_FTPS_USER", prompt=True),
-    ftps_password: str = typer.Option(..., envvar="ASIC_FTPS_PASSWORD", prompt=True),
+    ftps_user: Optional[str] = typer.Option(None, envvar="ASIC_FTPS_USER", help="Prompted for when missing"),
+    ftps_password: Optional[str] = typer.Option(None, envvar="ASIC_FTPS_PASSWORD", help="Prompted for when missing"),
     agent: str = typer.Option(default=None, envvar="ASIC_AGENT", help="Agent's asic code, required for private files"),
+    use_mlsd: bool = typer.Option(
+        True, "--mlsd/--no-mlsd", envvar="ASIC_FTPS_MLSD", help="List directories with MLSD (sizes and dates), falling back to NLST"
+    ),
+    cache_dir: pathlib.Path = typer.Option(
+        default=DEFAULT_CACHE_DIR, envvar="ASIC_CACHE_DIR", help="Directory for persistent caches (FTP listings, publications page)"
+    ),
+    numeric_policy: NumericPolicy = typer.Option(
+        NumericPolicy.FLOAT64,
+        "--numeric-policy",
+        envvar=NUMERIC_POLICY_ENVVAR,
+        case_sensitive=False,
+        help="Types of numeric columns when preprocessing: float64, float32 (half the memory) or nullable (Int64 integers)",
+    ),
 ):
     """
     FTP authentication info should be provided as environment variables (ASIC_FTP_*)
@@ -62,9 +98,30 @@ def main(
     ctx.meta["ASIC_FTPS_HOST"] = ftps_host
     ctx.meta["ASIC_FTPS_PORT"] = ftps_port
     ctx.meta["ASIC_FTPS_USER"] = ftps_user
-    ctx.meta["ASIC_FTPS_PASSWORD"] = pydantic.SecretStr(ftps_password)
+    ctx.meta["ASIC_FTPS_PASSWORD"] = (
+        pydantic.SecretStr(ftps_password) if ftps_password is not None else None
+    )
     ctx.meta["VERBOSITY"] = verbosity
     ctx.meta["ASIC_AGENT"] = agent
+    ctx.meta["ASIC_CACHE_DIR"] = cache_dir
+    ctx.meta["ASIC_FTPS_MLSD"] = use_mlsd
+    # Read by FileReader, also in the preprocessing worker processes
+    os.environ[NUMERIC_POLICY_ENVVAR] = numeric_policy.value
+
+
+def ftps_credentials(ctx: typer.Context) -> tuple[str, pydantic.SecretStr]:
+    """Return the FTP user and password, prompting for the missing ones.
+
+    Prompting here instead of in the callback lets offline commands (e.g.
+    `preprocess`) run without credentials.
+    """
+    if ctx.meta["ASIC_FTPS_USER"] is None:
+        ctx.meta["ASIC_FTPS_USER"] = typer.prompt("Ftps user")
+    if ctx.meta["ASIC_FTPS_PASSWORD"] is None:
+        ctx.meta["ASIC_FTPS_PASSWORD"] = pydantic.SecretStr(
+            typer.prompt("Ftps password", hide_input=True)
+        )
+    return ctx.meta["ASIC_FTPS_USER"], ctx.meta["ASIC_FTPS_PASSWORD"]
 
 
 def validate_month(month: str) -> str:
@@ -105,14 +162,16 @@ def validate_version(version: str) -> str:
     return version
 
 
-def months_callback(values: list[str]) -> list[str]:
+def months_callback(values: list[str] | None) -> list[str]:
+    if values is None:
+        return []
     months = sorted({validate_month(v) for v in values}, reverse=True)
     return months
 
 
-def file_kinds_callback(values: list[str]) -> list[str]:
+def file_kinds_callback(values: list[str] | None) -> list[str]:
     if values is None:
-        raise typer.BadParameter(SUPPORTED_FILE_KINDS_ERROR_MESSAGE)
+        return []
 
     files = sorted(
         {validate_file_kind(v) for v in values},
@@ -122,17 +181,22 @@ def file_kinds_callback(values: list[str]) -> list[str]:
     return files
 
 
-def extensions_callback(values: list[str]) -> list[str]:
+def extensions_callback(values: list[str] | None) -> list[str]:
     if values is None:
-        raise typer.BadParameter(SUPPORTED_EXTENSIONS_ERROR_MESSAGE)
+        return []
 
     extensions = list({validate_version(v) for v in values})
 
     return extensions
 
 
+def days_ago(days: int) -> dt.datetime:
+    return dt.datetime.combine(dt.date.today(), dt.datetime.min.time()) + dt.timedelta(days=-days)
+
+
 @cli.command()
 def pubs(
+    ctx: typer.Context,
     days_old: int = typer.Option(None),
     after: dt.datetime = typer.Option(None),
     include_daily: bool = typer.Option(False),
@@ -143,16 +207,16 @@ def pubs(
     message = "Listing latest published settlements by ASIC"
     if days_old is not None:
         message = message + f" in the last {days_old} days"
-        published_after = dt.datetime.combine(
-            dt.date.today(), dt.datetime.min.time()
-        ) + dt.timedelta(days=-days_old)
+        published_after = days_ago(days_old)
     elif after is not None:
         message = message + f" afte {after}"
         published_after = after
     else:
         published_after = None
     logger.info(message)
-    latest_publications = list_latest_published_versions(published_after, include_daily)
+    latest_publications = list_latest_published_versions(
+        published_after, include_daily, cache=PageCache.in_dir(ctx.meta["ASIC_CACHE_DIR"])
+    )
     for pub in latest_publications:
         typer.echo(
             f"{pub.month:%Y-%m}:{pub.version.upper()} -- published: {pub.published_at:%Y-%m-%d}"
@@ -184,6 +248,14 @@ def list_files(
         callback=extensions_callback,
         help=SUPPORTED_EXTENSIONS_ERROR_MESSAGE,
     ),
+    refresh_listing: bool = typer.Option(
+        False, "--refresh-listing", help="Ignore cached FTP listings and list the server again"
+    ),
+    latest_only: bool = typer.Option(
+        False,
+        "--latest-only",
+        help="Keep only the newest version (extension order) of each kind, agent and day",
+    ),
     # asic_raw_container_name: str = typer.Argument(
     #     "asic-raw", envvar="ASIC_RAW_CONTAINER_NAME"
     # ),
@@ -205,8 +277,7 @@ def list_files(
     )
     ftps_host = ctx.meta["ASIC_FTPS_HOST"]
     ftps_port = ctx.meta["ASIC_FTPS_PORT"]
-    ftps_user = ctx.meta["ASIC_FTPS_USER"]
-    ftps_password = ctx.meta["ASIC_FTPS_PASSWORD"]
+    ftps_user, ftps_password = ftps_credentials(ctx)
     verbosity = ctx.meta["VERBOSITY"]
 
     if not extensions:
@@ -234,7 +305,12 @@ def list_files(
         extensions=extensions,
         kinds=kinds,
         locations=list(locations),
+        cache=ListingCache.in_dir(ctx.meta["ASIC_CACHE_DIR"]),
+        refresh=refresh_listing,
+        use_mlsd=ctx.meta["ASIC_FTPS_MLSD"],
     )
+    if latest_only:
+        file_list = keep_latest_versions(file_list)
 
     ftps.quit()
 
@@ -242,6 +318,113 @@ def list_files(
         rich.print(f.path)
 
 
+def check_target_options(
+    months: list[str] | None,
+    from_pubs: bool,
+    days_old: int | None,
+    include_daily: bool,
+    direct: bool,
+    extensions: list[str] | None,
+) -> None:
+    """Check the options choosing how `plan_download_files` finds the files."""
+    if not months and not from_pubs:
+        raise typer.BadParameter("Missing --month (or use --from-pubs)", param_hint="--month")
+    if (days_old is not None or include_daily) and not from_pubs:
+        raise typer.BadParameter("--days-old and --include-daily require --from-pubs", param_hint="--from-pubs")
+    if direct and not extensions:
+        raise typer.BadParameter("--direct requires --version", param_hint="--direct")
+    if direct and from_pubs:
+        raise typer.BadParameter("--direct can not be used with --from-pubs", param_hint="--direct")
+
+
+def plan_download_files(
+    ctx: typer.Context,
+    pool: FTPSessionPool,
+    *,
+    months: list[dt.date],
+    from_pubs: bool,
+    published_after: dt.datetime | None,
+    include_daily: bool,
+    direct: bool,
+    agent: str | None,
+    kinds: list[str],
+    extensions: list[str],
+    refresh_listing: bool,
+) -> list[AsicFile]:
+    """Files to download, listed from the FTP server.
+
+    With `from_pubs` only the locations of the published versions are listed
+    and with `direct` the remote paths are built from the kind templates and
+    probed instead.
+    """
+    locations = {v.location for v in SUPPORTED_FILE_CLASSES.values() if v.kind in kinds}
+    if from_pubs:
+        publications = list_latest_published_versions(
+            published_after, include_daily, cache=PageCache.in_dir(ctx.meta["ASIC_CACHE_DIR"])
+        )
+        # --month and --version narrow the publications down
+        publications = [
+            p
+            for p in publications
+            if (not months or p.month.date().replace(day=1) in months)
+            and (not extensions or f".{p.version}" in {e.lower() for e in extensions})
+        ]
+        logger.info(f"Publications to download: {len(publications)}")
+        return list_target_files(
+            pool.session(),
+            plan_publication_targets(publications, locations, agent),
+            kinds=kinds,
+            cache=ListingCache.in_dir(ctx.meta["ASIC_CACHE_DIR"]),
+            use_mlsd=ctx.meta["ASIC_FTPS_MLSD"],
+        )
+    if direct:
+        candidates = synthesize_supported_files(months=months, extensions=extensions, kinds=kinds, agent=agent)
+        logger.info(f"Probing {len(candidates)} candidate files")
+        # One batch per kind and month, probed concurrently by the workers
+        batches = [
+            list(batch) for _, batch in itertools.groupby(candidates, key=lambda f: (f.kind, f.year, f.month))
+        ]
+        return [f for _, found in pool.map(probe_remote_files, batches) for f in found]
+    return list_supported_files(
+        pool.session(),
+        agent=agent,
+        months=months,
+        extensions=extensions or [None],  # type: ignore[list-item]
+        kinds=kinds,
+        locations=list(locations),
+        cache=ListingCache.in_dir(ctx.meta["ASIC_CACHE_DIR"]),
+        refresh=refresh_listing,
+        use_mlsd=ctx.meta["ASIC_FTPS_MLSD"],
+    )
+
+
+def download_specs(
+    file_list: list[AsicFile], destination: pathlib.Path, keep_raw: bool, incremental: bool
+) -> list[DownloadSpec]:
+    """Transfers for `file_list`, without the unchanged local copies when `incremental`."""
+    specs = []
+    skipped_files = 0
+    skipped_bytes = 0
+    for f in file_list:
+        local = mirror_path(f, destination)
+        if keep_raw:
+            os.makedirs(local.parent, exist_ok=True)
+        spec = DownloadSpec(remote=f.path, local=local, size=f.size, modified_at=f.modified_at)
+        if incremental and is_local_copy_current(spec):
+            logger.debug(f"Skipping unchanged file {f.path}")
+            skipped_files += 1
+            skipped_bytes += spec.size or 0
+            continue
+        specs.append(spec)
+
+    if incremental:
+        rich.print(
+            f"Skipping {skipped_files} unchanged files ({skipped_bytes} bytes not transferred),"
+            f" downloading {len(specs)} new or changed files"
+        )
+    return specs
+
+
 @cli.command()
 def download(
     ctx: typer.Context,
@@ -251,12 +434,28 @@ def download(
     prepocessed_dir: bool = typer.Option(
     False, "--prepro-dirs", help="Create directories for preprocessed files if not present"
     ),
-    months: list[str] = typer.Option(
-        ...,
+    months: Optional[list[str]] = typer.Option(
+        None,
         "--month",
         callback=months_callback,
         help=YEAR_MONTH_MATCH_ERROR_MESSAGE,
     ),
+    from_pubs: bool = typer.Option(
+        False,
+        "--from-pubs",
+        help="Download only the month/version combinations published on ASIC's website (see `pubs`)",
+    ),
+    days_old: Optional[int] = typer.Option(
+        None, "--days-old", min=0, help="With --from-pubs, only versions published in the last N days"
+    ),
+    include_daily: bool = typer.Option(
+        False, "--include-daily", help="With --from-pubs, also the daily TX1 and TX2 versions"
+    ),
+    direct: bool = typer.Option(
+        False,
+        "--direct",
+        help="Build the remote paths from the kind templates and probe them instead of listing directories (requires --version)",
+    ),
     agent: Optional[str] = typer.Option(default=None,
                                         envvar="ASIC_AGENT",
                                         prompt=True,
@@ -273,6 +472,51 @@ def download(
         callback=extensions_callback,
         help=SUPPORTED_EXTENSIONS_ERROR_MESSAGE,
     ),
+    refresh_listing: bool = typer.Option(
+        False, "--refresh-listing", help="Ignore cached FTP listings and list the server again"
+    ),
+    latest_only: bool = typer.Option(
+        False,
+        "--latest-only",
+        help="Keep only the newest version (extension order) of each kind, agent and day",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Skip files whose local copy matches the remote size and modification time",
+    ),
+    keep_raw: bool = typer.Option(
+        True,
+        "--raw/--no-raw",
+        help="Keep raw files on disk. With --no-raw files are preprocessed straight from memory (requires --prepro)",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        min=1,
+        help="Number of concurrent FTP sessions used to download files",
+    ),
+    processes: int = typer.Option(
+        0,
+        "--processes",
+        min=0,
+        help="Preprocess in this many worker processes while downloading (0 preprocesses inline)",
+    ),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        "--chunksize",
+        min=1,
+        help="Preprocess files in chunks of this many rows to bound memory",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.CSV,
+        "--output-format",
+        case_sensitive=False,
+        help=(
+            "csv: one CSV per file. columnar: numpy column files partitioned by kind/year/month/version."
+            " monthly-csv: one CSV per kind/year/month/version, files replace their own slice"
+        ),
+    ),
     destination: pathlib.Path = typer.Argument(...),
 ):
     """
@@ -280,92 +524,130 @@ def download(
 
     FTP authentication info should be provided as environment variables (ASIC_FTP_*)
     """
-    if not extensions:
-        extensions = [None]  # type: ignore
-    if not kinds:
-        kinds = SUPPORTED_FILE_KINDS
+    if chunksize is not None and output_format != OutputFormat.CSV:
+        raise typer.BadParameter("--chunksize only applies to csv output", param_hint="--chunksize")
+    check_target_options(months, from_pubs, days_old, include_daily, direct, extensions)
+    if not keep_raw and not is_preprocessing_required:
+        raise typer.BadParameter("--no-raw requires --prepro", param_hint="--no-raw")
+    if not keep_raw and incremental:
+        raise typer.BadParameter("--incremental compares raw files, it can not be used with --no-raw", param_hint="--incremental")
 
     ftps_host = ctx.meta["ASIC_FTPS_HOST"]
     ftps_port = ctx.meta["ASIC_FTPS_PORT"]
-    ftps_user = ctx.meta["ASIC_FTPS_USER"]
-    ftps_password = ctx.meta["ASIC_FTPS_PASSWORD"]
+    ftps_user, ftps_password = ftps_credentials(ctx)
     verbosity = ctx.meta["VERBOSITY"]
 
-    locations: set = set()
-    for v in SUPPORTED_FILE_CLASSES.values():
-        if v.kind in kinds:
-            locations.add(v.location)
-
-    ftps = get_ftps(
+    connect = functools.partial(
+        get_ftps,
         ftps_host=ftps_host,
         ftps_user=ftps_user,
         ftps_password=ftps_password,
         ftps_port=ftps_port,
         verbosity=verbosity,
     )
-    month_dates = [parse_month(m) for m in months]
-    file_list = list_supported_files(
-        ftps,
-        agent=agent,
-        months=month_dates,
-        extensions=extensions,
-        kinds=kinds,
-        locations=list(locations),
-    )
-
-    logger.info(f"Total files to download: {len(file_list)}")
+    with FTPSessionPool(connect, workers=workers) as pool:
+        file_list = plan_download_files(
+            ctx,
+            pool,
+            months=[parse_month(m) for m in months or []],
+            from_pubs=from_pubs,
+            published_after=days_ago(days_old) if days_old is not None else None,
+            include_daily=include_daily,
+            direct=direct,
+            agent=agent,
+            kinds=kinds or SUPPORTED_FILE_KINDS,
+            extensions=extensions or [],
+            refresh_listing=refresh_listing,
+        )
+        if latest_only:
+            file_list = keep_latest_versions(file_list)
+        logger.info(f"Total files to download: {len(file_list)}")
 
-    for f in rich.progress.track(file_list, description="Downloading files..."):
-        logger.info(f"File: {f.path}")
-        remote = f
-        local = destination / str(f.path)[1:]  # hack to remove root anchor
-        os.makedirs(local.parent, exist_ok=True)
-        logger.debug(f"Downloading {remote} to {local}")
+        files_by_remote = {f.path: f for f in file_list}
+        specs = download_specs(file_list, destination, keep_raw, incremental)
 
-        try:
-            grab_file(ftps, remote.path, local)
-
-        # except (ssl.SSLZeroReturnError, ssl.SSLEOFError):
-        except Exception:
-            logger.warning("Download failed, retrying connection")
-            ftps = get_ftps(
-                ftps_host=ftps_host,
-                ftps_user=ftps_user,
-                ftps_password=ftps_password,
-                ftps_port=ftps_port,
-                verbosity=verbosity,
-            )
-
-            grab_file(ftps, remote.path, local)
-
-        if is_preprocessing_required:
-            normalized_version = (
-                f.metadata.version
-                if f.metadata.version is not None
-                else f.metadata.extension
-            )
-            subpath_str = str(f.path)[1:].replace(
-                f"{f.year:04d}-{f.month:02d}",
-                f"{f.year:04d}-{f.month:02d}\\{normalized_version}",
-            )
-
-            preprocessed_path = destination.joinpath(subpath_str)
-
-            preprocessed = f.preprocess(local)
-            write_to = preprocessed_path.with_suffix(".csv")
-            try:
-                if prepocessed_dir:
-                    os.makedirs(preprocessed_path.parent, exist_ok=True)
-                preprocessed.to_csv(
-                    write_to,
-                    index=False,
-                    encoding="utf-8-sig",
+        grab: Callable[[ftplib.FTP, DownloadSpec], DownloadSpec | io.BytesIO | None] = (
+            grab_spec if keep_raw else grab_spec_to_memory
+        )
+        downloads = pool.map(grab, specs)
+        with preprocessing_pool(processes, destination, output_format) as preprocessing:
+            for spec, downloaded in rich.progress.track(
+                downloads, description="Downloading files...", total=len(specs)
+            ):
+                if downloaded is None:
+                    # Already logged by grab_spec
+                    continue
+                f = files_by_remote[spec.remote]
+                source = (
+                    downloaded.local
+                    if isinstance(downloaded, DownloadSpec)
+                    else downloaded.getvalue()
                 )
-            except Exception as e:
-                if "Cannot save file into a non-existent directory: " in str(e):
-                    raise FileNotFoundError(f"{e}. Use the '--prepro-dirs' flag to create the folder")
+                logger.info(f"Downloaded {f.path}")
+
+                if is_preprocessing_required and output_format == OutputFormat.MONTHLY_CSV:
+                    preprocessing.submit(preprocess_file, f, source)
+                elif is_preprocessing_required:
+                    preprocessing.submit(
+                        write_preprocessed,
+                        f,
+                        source,
+                        destination,
+                        prepocessed_dir,
+                        chunksize,
+                        output_format,
+                    )
 
-                raise e
 
+@cli.command()
+def preprocess(
+    source: pathlib.Path = typer.Argument(
+        ..., exists=True, file_okay=False, help="Local mirror of the FTP tree (a `download` destination)"
+    ),
+    destination: pathlib.Path = typer.Argument(..., help="Root of the preprocessed files"),
+    kinds: Optional[list[str]] = typer.Option(
+        None,
+        "--kind",
+        callback=file_kinds_callback,
+        help=SUPPORTED_FILE_KINDS_ERROR_MESSAGE,
+    ),
+    processes: int = typer.Option(
+        os.cpu_count() or 1,
+        "--processes",
+        min=0,
+        help="Number of worker processes (0 preprocesses inline)",
+    ),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        "--chunksize",
+        min=1,
+        help="Preprocess files in chunks of this many rows to bound memory",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.CSV,
+        "--output-format",
+        case_sensitive=False,
+        help=(
+            "csv: one CSV per file. columnar: numpy column files partitioned by kind/year/month/version."
+            " monthly-csv: one CSV per kind/year/month/version, files replace their own slice"
+        ),
+    ),
+):
+    """
+    Preprocess already downloaded files again, without connecting to the FTP server.
+    """
+    if chunksize is not None and output_format != OutputFormat.CSV:
+        raise typer.BadParameter("--chunksize only applies to csv output", param_hint="--chunksize")
+    files = list_local_files(source, kinds or None)
+    logger.info(f"Total files to preprocess: {len(files)}")
+
+    with preprocessing_pool(processes, destination, output_format) as preprocessing:
+        for f, local in rich.progress.track(files, description="Preprocessing files..."):
+            if output_format == OutputFormat.MONTHLY_CSV:
+                preprocessing.submit(preprocess_file, f, local)
+            else:
+                preprocessing.submit(
+                    write_preprocessed, f, local, destination, True, chunksize, output_format
+                )
 
-    ftps.quit()
+    rich.print(f"Preprocessed {preprocessing.completed} files into {destination}")
@@ -0,0 +1,139 @@
+import io
+import json
+import logging
+import os
+import pathlib
+from typing import Any
+
+import pandas as pd
+
+from asic.files.file import AsicFile
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".index.json"
+
+INDEX_FORMAT_VERSION = 1
+
+
+class ConsolidatedCSV:
+    """One CSV per kind, month and normalized version, appended file by file.
+
+    Each preprocessed file is a slice of `{root}/{kind}/{year}/{month}/{normalized_version}.csv`,
+    the header is written once when the month is created. A sidecar
+    `{normalized_version}.csv.index.json` keeps the columns and the byte
+    range of every slice, keyed by the remote stem and kept in key order, so
+    writing a file again replaces only its slice: the bytes after it are
+    moved and nothing before it is rewritten.
+
+    A month must have a single writer; `PreprocessingPool(on_result=...)`
+    runs the writes in the submitting process.
+    """
+
+    def __init__(self, root: pathlib.Path) -> None:
+        self.root = root
+
+    def path(self, kind: str, year: int, month: int, normalized_version: str) -> pathlib.Path:
+        return self.root / kind.lower() / f"{year:04d}" / f"{month:02d}" / f"{normalized_version}.csv"
+
+    def file_path(self, f: AsicFile) -> pathlib.Path:
+        return self.path(f.kind, f.year, f.month, f.normalized_version)
+
+    @staticmethod
+    def index_path(path: pathlib.Path) -> pathlib.Path:
+        return path.with_name(path.name + INDEX_SUFFIX)
+
+    def read_index(self, path: pathlib.Path) -> dict[str, Any] | None:
+        """Index of the month at `path`, None when it was not written yet."""
+        index_path = self.index_path(path)
+        if not index_path.exists():
+            return None
+        with open(index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        if not path.exists() or path.stat().st_size != _end(index):
+            raise ValueError(
+                f"{path} does not match its index {index_path}, delete both and preprocess the month again"
+            )
+        return index
+
+    def write(self, f: AsicFile, frame: pd.DataFrame) -> pathlib.Path:
+        """Insert `frame`, the preprocessed `f`, replacing a previous slice of `f`."""
+        path = self.file_path(f)
+        key = f.path.stem.lower()
+        columns = [str(c) for c in frame.columns]
+        body = frame.to_csv(index=False, header=False).encode("utf-8")
+
+        index = self.read_index(path)
+        if index is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            header = frame.head(0).to_csv(index=False).encode("utf-8-sig")
+            index = {
+                "format_version": INDEX_FORMAT_VERSION,
+                "kind": str(f.kind.value),
+                "columns": columns,
+                "header_end": len(header),
+                "slices": [],
+            }
+            with open(path, "wb") as out:
+                out.write(header)
+        elif index["columns"] != columns:
+            raise ValueError(
+                f"Columns of {f.path} {columns} do not match the columns of {path} {index['columns']}"
+            )
+
+        slices: list[dict[str, Any]] = index["slices"]
+        position = next((i for i, s in enumerate(slices) if s["key"] >= key), len(slices))
+        replaced = position < len(slices) and slices[position]["key"] == key
+        following = slices[position + 1 :] if replaced else slices[position:]
+        start = slices[position]["start"] if position < len(slices) else _end(index)
+
+        with open(path, "r+b") as out:
+            tail = b""
+            if following:
+                out.seek(following[0]["start"])
+                tail = out.read()
+            out.seek(start)
+            out.write(body)
+            out.write(tail)
+            out.truncate()
+
+        shift = start + len(body) - (following[0]["start"] if following else 0)
+        for s in following:
+            s["start"] += shift
+            s["end"] += shift
+        written = {"key": key, "source": str(f.path), "start": start, "end": start + len(body), "rows": len(frame)}
+        index["slices"] = slices[:position] + [written] + following
+        self._write_index(path, index)
+
+        logger.debug(
+            f"{'Replaced' if replaced else 'Inserted'} {len(frame)} rows of {f.path} in {path}"
+            f" ({len(tail)} following bytes moved)"
+        )
+        return path
+
+    def read_slice(self, path: pathlib.Path, key: str) -> pd.DataFrame:
+        """Read only the rows of the file with stem `key` from the month at `path`."""
+        index = self.read_index(path)
+        if index is None:
+            raise FileNotFoundError(f"No consolidated file at {path}")
+        try:
+            s = next(s for s in index["slices"] if s["key"] == key.lower())
+        except StopIteration:
+            raise KeyError(f"No slice '{key}' in {path}") from None
+        with open(path, "rb") as source:
+            header = source.read(index["header_end"])
+            source.seek(s["start"])
+            body = source.read(s["end"] - s["start"])
+        return pd.read_csv(io.BytesIO(header + body), encoding="utf-8-sig")
+
+    def _write_index(self, path: pathlib.Path, index: dict[str, Any]) -> None:
+        index_path = self.index_path(path)
+        partial = index_path.with_name(index_path.name + ".part")
+        with open(partial, "w", encoding="utf-8") as out:
+            json.dump(index, out, ensure_ascii=False, indent=1)
+        os.replace(partial, index_path)
+
+
+def _end(index: dict[str, Any]) -> int:
+    return index["slices"][-1]["end"] if index["slices"] else index["header_end"]
+
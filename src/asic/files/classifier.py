@@ -0,0 +1,88 @@
+import datetime as dt
+import functools
+import logging
+import re
+from pathlib import PureWindowsPath
+from typing import Any, Iterable, Type
+
+from asic.files.definitions import SUPPORTED_FILE_CLASSES
+from asic.files.file import AsicFile, FileKind
+
+logger = logging.getLogger(__name__)
+
+NAMED_GROUP_REGEX = re.compile(r"\(\?P<(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)>")
+
+
+class KindClassifier:
+    """Classify remote paths into AsicFile kinds with a single regex match.
+
+    The `location_pattern + name_pattern` of every kind is compiled into one
+    alternation, each kind in its own named branch (`k0`, `k1`, ...). The
+    capture groups of each branch are prefixed with the branch name so the
+    same group (`location_year`, `name_day`, ...) can appear in every kind.
+    Branches are tried in the order of `classes`, like `cast_into_kinds` did
+    when trying each kind in turn.
+    """
+
+    def __init__(self, classes: Iterable[Type[AsicFile]]) -> None:
+        self.classes: list[Type[AsicFile]] = list(classes)
+        self.group_names: list[list[tuple[str, str]]] = []
+        branches = []
+        for i, c in enumerate(self.classes):
+            branch = self.branch_name(i)
+            path_pattern = c.location_pattern + c.name_pattern
+            names = [m["name"] for m in NAMED_GROUP_REGEX.finditer(path_pattern)]
+            self.group_names.append([(f"{branch}_{n}", n) for n in names])
+            prefixed = NAMED_GROUP_REGEX.sub(rf"(?P<{branch}_\g<name>>", path_pattern)
+            branches.append(f"(?P<{branch}>{prefixed})")
+        # Anchored so that `search` based tools (e.g. `Series.str.extract`)
+        # behave like `re.match` on the full path.
+        self.pattern = re.compile("^(?:" + "|".join(branches) + ")", flags=re.IGNORECASE)
+
+    @staticmethod
+    def branch_name(index: int) -> str:
+        return f"k{index}"
+
+    @property
+    def kinds(self) -> list[FileKind]:
+        return [c.kind for c in self.classes]
+
+    def classify(
+        self, path: PureWindowsPath
+    ) -> tuple[Type[AsicFile], dict[str, Any]] | None:
+        """Return the kind of `path` and its extracted groups, `None` if unsupported."""
+        match = self.pattern.match(path.as_posix())
+        if match is None:
+            return None
+        index = int(match.lastgroup[1:])  # type: ignore[index]
+        match_groups = {name: match[prefixed] for prefixed, name in self.group_names[index]}
+        return self.classes[index], match_groups
+
+    def cast(
+        self,
+        path: PureWindowsPath,
+        size: int | None = None,
+        modified_at: dt.datetime | None = None,
+    ) -> AsicFile | None:
+        """Build the AsicFile for `path`, `None` if it does not match a supported kind."""
+        classified = self.classify(path)
+        if classified is None:
+            logger.debug(f"Failed to match a kind to {path}")
+            return None
+        asic_file_class, match_groups = classified
+        try:
+            return asic_file_class.from_match_groups(
+                path, match_groups, size=size, modified_at=modified_at
+            )
+        except ValueError:
+            logger.debug(f"Failed kind '{asic_file_class.kind}' for {path}")
+            return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_kind_classifier(classes: tuple[Type[AsicFile], ...]) -> KindClassifier:
+    """Return the classifier for `classes`, compiled once per combination."""
+    return KindClassifier(classes)
+
+
+SUPPORTED_FILE_CLASSIFIER = get_kind_classifier(tuple(SUPPORTED_FILE_CLASSES.values()))
@@ -1,27 +1,28 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
-
-import numpy as np
+from pathlib import PureWindowsPath
+from typing import Any
 
 # Third party imports
 import pandas as pd
 
 from asic import ASIC_FILE_CONFIG
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import HOUR_COLUMNS, stack_hour_blocks
 
 # Local application imports
 
 logger = logging.getLogger(__name__)
 
+CODES = ["DMRE", "PRRE", "DMNR", "PRNR"]
+
 FORMAT = {
     "type": "csv",
     "sep": ";",
     "encoding": "cp1252",
     "dt_fields": {},
     "dtype": {
-        "CODIGO": str,
-        "AGENTE": str,
+        "CODIGO": "category",
+        "AGENTE": "category",
         "CONTENIDO": str,
         "HORA 01": float,
         "HORA 02": float,
@@ -52,6 +53,8 @@ FORMAT = {
 
 
 class ADEM(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.ADEM
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -60,6 +63,8 @@ class ADEM(AsicFile):
     description = ASIC_FILE_CONFIG[kind].description
 
     _format = FORMAT
+    # Agents are aligned across the code rows of the whole file
+    chunkable = False
 
     @property
     def path(self) -> PureWindowsPath:
@@ -89,7 +94,7 @@ class ADEM(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         ADEM: es un archivo diario
         versiones: TX2, TXR, TXF
@@ -101,52 +106,24 @@ class ADEM(AsicFile):
         PRRE: perdidas reguladas
         PRNR: perdidas no reguladas
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-
-        filter = np.full(total.index.shape, True)
-        filter = filter & (total["CODIGO"].isin(["DMRE", "PRRE","DMNR","PRNR"]))
-
-        total = total[filter]
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
-        )
-        total = (
-            total.set_index(["FECHA", "CODIGO", "AGENTE", "CONTENIDO"])
-            .stack()
-            .reset_index()
-        )
-        total = total.rename(columns={"level_4": "NOMBRE HORA", 0: "VALOR"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
-
-        total = (
-            total[
-                [
-                    "FECHA",
-                    "NOMBRE HORA",
-                    "HORA",
-                    "FECHA_HORA",
-                    "AGENTE",
-                    "CODIGO",
-                    "VALOR",
-                ]
-            ]
-            .set_index(
-                ["FECHA", "NOMBRE HORA", "HORA", "FECHA_HORA", "AGENTE", "CODIGO"]
-            )
-            .unstack()
-            .reset_index()
-        )
-        cols = [
-            f"{l1}_{l0}" if l1 else str(l0)
-            for (l0, l1) in zip(
-                total.columns.get_level_values(0), total.columns.get_level_values(1), strict=False
-            )
-        ]
-        total.columns = cols  # type: ignore
+        total = total[total["CODIGO"].isin(CODES)]
+
+        # One 24 hour block per code, aligned on the sorted agents
+        agents = pd.Index(total["AGENTE"].unique()).sort_values()
+        wide: dict[str, Any] = {"AGENTE": agents}
+        blocks = {}
+        for code in CODES:
+            code_rows = total[total["CODIGO"] == code]
+            if code_rows.empty:
+                logger.warning(f"No {code} rows in {self.path}, {code}_VALOR will be empty")
+            repeated = code_rows["AGENTE"][code_rows["AGENTE"].duplicated()]
+            if not repeated.empty:
+                raise ValueError(f"{self.path} has more than one {code} row for agents {sorted(set(repeated))}")
+            hours = code_rows.set_index("AGENTE")[HOUR_COLUMNS].reindex(agents).to_numpy()
+            names = [f"{code}_{h}" for h in HOUR_COLUMNS]
+            wide.update(zip(names, hours.T, strict=True))
+            blocks[f"{code}_VALOR"] = names
+
+        total = stack_hour_blocks(pd.DataFrame(wide), ["AGENTE"], date=self.date, blocks=blocks)
         return_cols = ["FECHA_HORA", "AGENTE", "DMRE_VALOR", "PRRE_VALOR","DMNR_VALOR","PRNR_VALOR"]
         return total[return_cols]
-
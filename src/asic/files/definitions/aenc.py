@@ -1,12 +1,12 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
 
 from asic import ASIC_FILE_CONFIG
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hours
 
 # Local application imports
 
@@ -18,10 +18,10 @@ FORMAT = {
     "encoding": "cp1252",
     "dt_fields": {},
     "dtype": {
-        "CODIGO SIC": str,
-        "CODIGO PROPIO": str,
-        "TIPO DE AGRUPACIÓN": str,
-        "IMPO - EXPO": str,
+        "CODIGO SIC": "category",
+        "CODIGO PROPIO": "category",
+        "TIPO DE AGRUPACIÓN": "category",
+        "IMPO - EXPO": "category",
         "HORA 01": float,
         "HORA 02": float,
         "HORA 03": float,
@@ -51,6 +51,8 @@ FORMAT = {
 
 
 class AENC(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.AENC
     visibility = VisibilityEnum.AGENT
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -95,38 +97,25 @@ class AENC(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         AENC: es un archivo diario
         versiones: TX2, TXR, TXF
         VALOR: energia calculada por ASIC para frontera en cada periodo
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-        total["AGENTE"] = self.agent
-
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
-        )
-        total = (
-            total.set_index(
-                [
-                    "FECHA",
-                    "AGENTE",
-                    "CODIGO SIC",
-                    "CODIGO PROPIO",
-                    "TIPO DE AGRUPACIÓN",
-                    "IMPO - EXPO",
-                ]
-            )
-            .stack()
-            .reset_index()
+        total["AGENTE"] = pd.Series(self.agent, index=total.index, dtype="category")
+
+        total = stack_hours(
+            total,
+            [
+                "AGENTE",
+                "CODIGO SIC",
+                "CODIGO PROPIO",
+                "TIPO DE AGRUPACIÓN",
+                "IMPO - EXPO",
+            ],
+            date=self.date,
         )
-        total = total.rename(columns={"level_6": "NOMBRE HORA", 0: "VALOR"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
 
         # total = (
         #     total[
@@ -1,7 +1,6 @@
 
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 import re
 
 import pandas as pd
@@ -16,8 +15,10 @@ FORMAT = {
     "sep": ";",
     "encoding": "cp1252",
     "dt_fields": {},
+    # Concepts added to the settlement over time are values too
+    "undeclared_dtype": float,
     "dtype": {
-        "AGENTE": str,
+        "AGENTE": "category",
         "PERDIDA REAL (kWh)": float,
         "DEMANDA REAL (kWh)": float,
         "GENERACION REAL (kWh)": float,
@@ -135,6 +136,8 @@ FORMAT = {
 
 
 class AFAC(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.AFAC
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -171,13 +174,12 @@ class AFAC(AsicFile):
     def version(self) -> str | None:
         return self._version
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         AFAC: es un archivo mensual
         versiones: TXR, TXF, TXn
         VALOR: Muestra para cada uno de los agentes, todos los conceptos de la liquidación del Mercado Colombiano, con los cuales se pueden consolidar las Compras y Ventas Totales del Agente para un proceso de liquidación o ajuste mensual.
         """
-        total = self.read(target)
         total = total.set_index(["AGENTE"]).stack().reset_index()
         total = total.rename(columns={"level_1": "CONCEPTO", 0: "VALOR"})
         ret_cols = ["AGENTE", "CONCEPTO", "VALOR"]
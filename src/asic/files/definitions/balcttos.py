@@ -1,12 +1,12 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
 
 from asic import ASIC_FILE_CONFIG
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hours
 
 logger = logging.getLogger(__name__)
 FORMAT = {
@@ -15,13 +15,13 @@ FORMAT = {
     "encoding": "cp1252",
     "dt_fields": {},
     "dtype": {
-        "CONCEPTO": str,
-        "MERCADO": str,
+        "CONCEPTO": "category",
+        "MERCADO": "category",
         "CÓDIGO CONTRATO": str,
-        "COMPRADOR": str,
-        "VENDEDOR": str,
-        "TIPO DE DESPACHO": str,
-        "TIPO ASIGNA": str,
+        "COMPRADOR": "category",
+        "VENDEDOR": "category",
+        "TIPO DE DESPACHO": "category",
+        "TIPO ASIGNA": "category",
         "HORA 01": float,
         "HORA 02": float,
         "HORA 03": float,
@@ -51,6 +51,8 @@ FORMAT = {
 
 
 class BALCTTOS(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.BALCTTOS
     visibility = VisibilityEnum.AGENT
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -88,7 +90,7 @@ class BALCTTOS(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         balcttos: se publica un archivo por día.
         versiones: TX2, TXR y TXF
@@ -98,34 +100,19 @@ class BALCTTOS(AsicFile):
         AGENTE:
         EPSC: Código SIC del agente comercializador
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
-        )
-        total = (
-            total.set_index(
-                [
-                    "FECHA",
-                    "CONCEPTO",
-                    "MERCADO",
-                    "CÓDIGO CONTRATO",
-                    "COMPRADOR",
-                    "VENDEDOR",
-                    "TIPO DE DESPACHO",
-                    "TIPO ASIGNA",
-                ]
-            )
-            .stack()
-            .reset_index()
+        total = stack_hours(
+            total,
+            [
+                "CONCEPTO",
+                "MERCADO",
+                "CÓDIGO CONTRATO",
+                "COMPRADOR",
+                "VENDEDOR",
+                "TIPO DE DESPACHO",
+                "TIPO ASIGNA",
+            ],
+            date=self.date,
         )
-        total = total.rename(columns={"level_8": "NOMBRE HORA", 0: "VALOR"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
-        total["HORA"] = total["FECHA_HORA"].dt.strftime("%H:%M:%S")
         ret_cols = [
             "FECHA_HORA",
             "CONCEPTO",
@@ -1,12 +1,12 @@
 
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 import pandas as pd
 
 from asic import ASIC_FILE_CONFIG
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hour_blocks
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +17,11 @@ FORMAT = {
     "dt_fields": {},
     "dtype": {
         "CONTRATO": str,
-        "VENDEDOR": str,
-        "COMPRADOR": str,
-        "TIPO": str,
-        "TIPOMERC": str,
-        "TIPO ASIGNA": str,
+        "VENDEDOR": "category",
+        "COMPRADOR": "category",
+        "TIPO": "category",
+        "TIPOMERC": "category",
+        "TIPO ASIGNA": "category",
         "DESP_HORA 01": float,
         "DESP_HORA 02": float,
         "DESP_HORA 03": float,
@@ -75,6 +75,8 @@ FORMAT = {
 
 
 class DSPCTTOS(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.DSPCTTOS
     visibility = VisibilityEnum.AGENT
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -111,73 +113,22 @@ class DSPCTTOS(AsicFile):
     def version(self) -> str | None:
         return self._version
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         DSPCTTOS: es un archivo mensual
         versiones: TXR, TXF, TXn
         VALOR: Muestra para cada uno de los agentes, todos los conceptos de la liquidación del Mercado Colombiano, con los cuales se pueden consolidar las Compras y Ventas Totales del Agente para un proceso de liquidación o ajuste mensual.
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
-        )
-        total = (
-            total.set_index(
-                ["FECHA", "CONTRATO", "VENDEDOR", "COMPRADOR", "TIPO", "TIPOMERC", "TIPO ASIGNA"]
-            )
-            .stack()
-            .reset_index()
+        total = stack_hour_blocks(
+            total,
+            ["CONTRATO", "VENDEDOR", "COMPRADOR", "TIPO", "TIPOMERC", "TIPO ASIGNA"],
+            date=self.date,
+            blocks={
+                "DESP_VALOR": [f"DESP_HORA {h:02d}" for h in range(1, 25)],
+                "TRF_VALOR": [f"TRF_HORA {h:02d}" for h in range(1, 25)],
+            },
         )
 
-        total = total.rename(columns={"level_7": "NOMBRE HORA", 0: "VALOR"})
-        total["CONCEPTO"] = total["NOMBRE HORA"].apply(lambda x: x.split("_")[0])
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
-
-        total = (
-            total[
-                [
-                    "FECHA",
-                    "HORA",
-                    "FECHA_HORA",
-                    "CONTRATO",
-                    "VENDEDOR",
-                    "COMPRADOR",
-                    "TIPO",
-                    "TIPOMERC",
-                    "TIPO ASIGNA",
-                    "CONCEPTO",
-                    "VALOR",
-                ]
-            ]
-            .set_index(
-                [
-                    "FECHA",
-                    "HORA",
-                    "FECHA_HORA",
-                    "CONTRATO",
-                    "VENDEDOR",
-                    "COMPRADOR",
-                    "TIPO",
-                    "TIPOMERC",
-                    "TIPO ASIGNA",
-                    "CONCEPTO",
-                ]
-            )
-            .unstack()
-            .reset_index()
-        )
-        cols = [
-            f"{l1}_{l0}" if l1 else l0
-            for (l0, l1) in zip(
-                total.columns.get_level_values(0), total.columns.get_level_values(1)
-            )
-        ]
-        total.columns = pd.Index(cols)
-
         ret_cols = [
             "FECHA_HORA",
             "CONTRATO",
@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
@@ -16,11 +15,13 @@ FORMAT = {
     "sep": ";",
     "encoding": "cp1252",
     "dt_fields": {},
-    "dtype": {"AGENTE": str, "VALOR PE": float},
+    "dtype": {"AGENTE": "category", "VALOR PE": float},
 }
 
 
 class PEP(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.PEP
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -58,14 +59,13 @@ class PEP(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         pep: se publica un archivo por día.
         versiones: TX1, TX2, TXR y TXF
         AGENTE:
           SISTEMA: el precio de escasez ponderado del sistema
         """
-        total = self.read(target)
         total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
 
         total["FECHA"] = pd.to_datetime(
@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
@@ -21,6 +20,8 @@ FORMAT = {
 
 
 class PME(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.PME
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -58,14 +59,13 @@ class PME(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         PME: se publica un archivo mensual.
         versiones: TXA
         AGENTE:
           SISTEMA: el precio de escacez de activación
         """
-        total = self.read(target)
         total["MES"] = f"{self.year:04d}-{self.month:02d}"
 
         return_cols = ["MES", "CONCEPTO", "DESCRIPCION", "VALOR"]
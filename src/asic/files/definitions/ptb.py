@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 import numpy as np
 
@@ -40,6 +39,8 @@ FORMAT = {
 
 
 class PTB(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.PTB
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -77,13 +78,11 @@ class PTB(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         PTB: es un archivo diario
         versiones: TX2, TXR, TXF
         """
-        total = self.read(target)
-
         total["FECHA"] = pd.to_datetime(
             total["FECHA"],
             format="%Y-%m-%d",
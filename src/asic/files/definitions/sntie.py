@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
@@ -8,6 +7,7 @@ import pandas as pd
 from asic import ASIC_FILE_CONFIG
 # Local application imports
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hours
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +18,9 @@ FORMAT = {
     "dt_fields": {},
     "dtype": {
         "FECHA": str,
-        "AGENTE": str,
-        "CONCEPTO": str,
-        "BANDERA": str,
+        "AGENTE": "category",
+        "CONCEPTO": "category",
+        "BANDERA": "category",
         "HORA 01": float,
         "HORA 02": float,
         "HORA 03": float,
@@ -50,6 +50,8 @@ FORMAT = {
 
 
 class SNTIE(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.SNTIE
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -87,7 +89,7 @@ class SNTIE(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         tgrl: se publica un archivo por día.
         versiones: TX2, TXR ,TXF, TXn
@@ -97,15 +99,10 @@ class SNTIE(AsicFile):
         AGENTE:
             ENBC: Código SIC del agente comercializador
         """
-        total = self.read(target)
         total["FECHA"] = pd.to_datetime(
             total["FECHA"],
             format="%Y-%m-%d",
         )
-        total = total.set_index(["AGENTE","CONCEPTO", "BANDERA", "FECHA"]).stack().reset_index()
-        total = total.rename(columns={"level_4": "NOMBRE HORA", 0: "VALOR"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
+        total = stack_hours(total, ["AGENTE", "CONCEPTO", "BANDERA", "FECHA"], date="FECHA")
         ret_cols = ["FECHA_HORA", "AGENTE", "CONCEPTO", "BANDERA", "VALOR"]
         return total[ret_cols]
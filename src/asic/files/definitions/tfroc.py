@@ -1,7 +1,6 @@
 
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 import pandas as pd
 
@@ -30,6 +29,8 @@ FORMAT = {
 }
 
 class TFROC(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.TFROC
     visibility = VisibilityEnum.AGENT
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -67,12 +68,10 @@ class TFROC(AsicFile):
     def version(self) -> str | None:
         return self._version
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         TFROC: es un archivo diario
         versiones: TX2, TXR, TXF
         VALOR: energia calculada por ASIC para frontera en cada periodo
         """
-        total = self.read(target)
-
         return total
@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
@@ -8,6 +7,7 @@ import pandas as pd
 from asic import ASIC_FILE_CONFIG
 # Local application imports
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hours
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +17,9 @@ FORMAT = {
     "encoding": "cp1252",
     "dt_fields": {},
     "dtype": {
-        "CODIGO": str,
-        "CONTENIDO": str,
+        "CODIGO": "category",
+        "AGENTE": "category",
+        "CONTENIDO": "category",
         "HORA 01": float,
         "HORA 02": float,
         "HORA 03": float,
@@ -48,6 +49,8 @@ FORMAT = {
 
 
 class TGRL(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.TGRL
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -85,7 +88,7 @@ class TGRL(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         tgrl: se publica un archivo por día.
         versiones: TX2, TXR ,TXF, TXn
@@ -95,16 +98,10 @@ class TGRL(AsicFile):
         AGENTE:
             ENBC: Código SIC del agente comercializador
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
+        total = stack_hours(
+            total,
+            ["AGENTE", "CODIGO", "CONTENIDO"],
+            date=self.date,
         )
-        total = total.set_index(["AGENTE","CODIGO", "CONTENIDO", "FECHA"]).stack().reset_index()
-        total = total.rename(columns={"level_4": "NOMBRE HORA", 0: "VALOR"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
         ret_cols = ["FECHA_HORA", "AGENTE", "CODIGO", "CONTENIDO", "VALOR"]
         return total[ret_cols]
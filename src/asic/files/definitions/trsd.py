@@ -1,6 +1,5 @@
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 # Third party imports
 import pandas as pd
@@ -8,6 +7,7 @@ import pandas as pd
 from asic import ASIC_FILE_CONFIG
 # Local application imports
 from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.files.hourly import stack_hours
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +17,8 @@ FORMAT = {
     "encoding": "cp1252",
     "dt_fields": {},
     "dtype": {
-        "CODIGO": str,
-        "CONTENIDO": str,
+        "CODIGO": "category",
+        "CONTENIDO": "category",
         "HORA 01": float,
         "HORA 02": float,
         "HORA 03": float,
@@ -48,6 +48,8 @@ FORMAT = {
 
 
 class TRSD(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.TRSD
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -85,24 +87,17 @@ class TRSD(AsicFile):
     def agent(self) -> str | None:
         return self._agent
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         trsd: se publica un archivo por día.
         versiones: TX1, TX2, TXR y TXF
         PBNA: Precio de bolsa nacional
         """
-        total = self.read(target)
-        total["FECHA"] = f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
-        total["FECHA"] = pd.to_datetime(
-            total["FECHA"],
-            format="%Y-%m-%d",
+        total = stack_hours(
+            total,
+            ["CODIGO", "CONTENIDO"],
+            date=self.date,
+            value_name="PRECIO",
         )
-        total = total.set_index(["CODIGO", "CONTENIDO", "FECHA"]).stack().reset_index()
-        total = total.rename(columns={"level_3": "NOMBRE HORA", 0: "PRECIO"})
-        total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
-        total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
-        total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
-        total["HORA"] = total["FECHA_HORA"].dt.strftime("%H:%M:%S")
-        total["FECHA"] = total["FECHA"].dt.date
         ret_cols = ["FECHA_HORA", "CODIGO", "CONTENIDO", "PRECIO"]
         return total[ret_cols]
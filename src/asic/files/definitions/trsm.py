@@ -1,7 +1,6 @@
 
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 import pandas as pd
 
@@ -24,6 +23,8 @@ FORMAT = {
 }
 
 class TRSM(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.TRSM
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -61,12 +62,10 @@ class TRSM(AsicFile):
     def version(self) -> str | None:
         return self._version
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         TRSM: es un archivo mensual
         versiones: TXR, TXF
         VALOR: Contiene información de indicadores económicos, energéticos y financieros.
         """
-        total = self.read(target)
-
         return total
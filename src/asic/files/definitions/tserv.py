@@ -1,7 +1,6 @@
 
 import logging
-from io import BytesIO, StringIO
-from pathlib import Path, PureWindowsPath
+from pathlib import PureWindowsPath
 
 import pandas as pd
 
@@ -17,16 +16,18 @@ FORMAT = {
     "dt_fields": {},
     "dtype": {
         "FECHA": str,
-        "AGENTE": str,
-        "BENEFICIARIO": str,
-        "CONCEPTO": str,
-        "TIPOPAGO": str,
+        "AGENTE": "category",
+        "BENEFICIARIO": "category",
+        "CONCEPTO": "category",
+        "TIPOPAGO": "category",
         "VALOR": int,
         "MAGNITUD": int,
     }
 }
 
 class TSERV(AsicFile):
+    __slots__ = ()
+
     kind = FileKind.TSERV
     visibility = VisibilityEnum.PUBLIC
     name_pattern = ASIC_FILE_CONFIG[kind].name_pattern
@@ -64,12 +65,10 @@ class TSERV(AsicFile):
     def version(self) -> str | None:
         return self._version
 
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
         """
         TSERV: es un archivo mensual
         versiones: TXR, TXF, TXn
         VALOR: Contiene el soporte a la liquidación de servicios CND, SIC y FAZNI.
         """
-        total = self.read(target)
-
         return total
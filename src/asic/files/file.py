@@ -1,8 +1,11 @@
+import datetime as dt
 import enum
+import logging
 import re
 from abc import ABC, abstractmethod
 from io import BytesIO, StringIO
 from pathlib import Path, PureWindowsPath
+from typing import Any, ClassVar, Iterator
 
 import pandas as pd
 import pydantic
@@ -11,6 +14,8 @@ from typing_extensions import Self
 from asic import ASIC_FILE_EXTENSION_MAP, ASIC_FILE_CONFIG
 from asic.reader import FileReader
 
+logger = logging.getLogger(__name__)
+
 PATTERN_REGEX = re.compile(
     pattern=r"""
     \(                              # Start of group definition
@@ -57,6 +62,18 @@ def pattern_to_template(patt: str) -> str:
     return template
 
 
+LITERAL_REGEX = re.compile(r"[a-zA-Z0-9_-]+")
+
+
+def pattern_literals(patt: str) -> dict[str, str]:
+    """Template fields whose pattern group only matches a literal, e.g. `(?P<kind>BalCttos)`."""
+    return {
+        m["capture_name"]: m["regex"]
+        for m in PATTERN_REGEX.finditer(patt)
+        if LITERAL_REGEX.fullmatch(m["regex"] or "")
+    }
+
+
 class FileKind(str, enum.Enum):
     ADEM = "adem"
     AENC = "aenc"
@@ -103,12 +120,50 @@ class VisibilityEnum(str, enum.Enum):
 
 
 class AsicFile(ABC):
+    """A remote ASIC file of a given kind.
+
+    Everything shared by the files of a kind (patterns, templates, reader) is
+    a class attribute computed once per subclass; instances are compact
+    `__slots__` records holding only the per path metadata. Subclasses must
+    declare `__slots__ = ()` to stay that way.
+    """
+
+    __slots__ = (
+        "_path",
+        "_year",
+        "_month",
+        "_day",
+        "_extension",
+        "_version",
+        "_agent",
+        "_size",
+        "_modified_at",
+    )
+
     kind: FileKind
     visibility: VisibilityEnum
     name_pattern: str
     location_pattern: str
     location: str
     description: str | None
+    name_template: ClassVar[str]
+    location_template: ClassVar[str]
+    template_literals: ClassVar[dict[str, str]]
+    reader: ClassVar[FileReader]
+    # Whether `transform` only relates values within a row, so that it gives
+    # the same rows when applied to consecutive chunks of the file.
+    chunkable: ClassVar[bool] = True
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "name_pattern" in cls.__dict__:
+            cls.name_template = pattern_to_template(cls.name_pattern)
+        if "location_pattern" in cls.__dict__:
+            cls.location_template = pattern_to_template(cls.location_pattern)
+        if "name_pattern" in cls.__dict__ or "location_pattern" in cls.__dict__:
+            cls.template_literals = pattern_literals(cls.location_pattern + cls.name_pattern)
+        if isinstance(cls.__dict__.get("_format"), dict):
+            cls.reader = FileReader(cls.__dict__["_format"])
 
     @property
     @abstractmethod
@@ -146,7 +201,8 @@ class AsicFile(ABC):
         pass
 
     @abstractmethod
-    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+    def transform(self, total: pd.DataFrame) -> pd.DataFrame:
+        """Turn the rows read from a file into their preprocessed form."""
         pass
 
     @property
@@ -163,6 +219,8 @@ class AsicFile(ABC):
         day: int | None = None,
         version: str | None = None,
         agent: str | None = None,
+        size: int | None = None,
+        modified_at: dt.datetime | None = None,
     ) -> None:
         self._path: PureWindowsPath = path
         self._year: int = year
@@ -171,13 +229,54 @@ class AsicFile(ABC):
         self._extension: str = extension
         self._version: str | None = version
         self._agent: str | None = agent
-        self.reader = FileReader(self._format)
-        self.name_template = pattern_to_template(self.name_pattern)
-        self.location_template = pattern_to_template(self.location_pattern)
+        self._size: int | None = size
+        self._modified_at: dt.datetime | None = modified_at
+
+    @property
+    def size(self) -> int | None:
+        """Remote size in bytes, when known from the listing."""
+        return self._size
+
+    @property
+    def modified_at(self) -> dt.datetime | None:
+        """Remote modification time, when known from the listing."""
+        return self._modified_at
+
+    @property
+    def normalized_version(self) -> str:
+        """Version used in local layouts, the extension for unversioned files."""
+        return self.version if self.version is not None else self.extension
+
+    @property
+    def date(self) -> dt.date:
+        """Day the file covers, the first of the month for monthly files."""
+        return dt.date(self.year, self.month, self.day or 1)
 
     def read(self, target: str | Path | StringIO | BytesIO) -> pd.DataFrame:
         return self.reader.read(target)
 
+    def read_iter(
+        self, target: str | Path | StringIO | BytesIO, chunksize: int
+    ) -> Iterator[pd.DataFrame]:
+        return self.reader.read_iter(target, chunksize)
+
+    def preprocess(self, target: Path | BytesIO | StringIO) -> pd.DataFrame:
+        return self.transform(self.read(target))
+
+    def preprocess_iter(
+        self, target: Path | BytesIO | StringIO, chunksize: int
+    ) -> Iterator[pd.DataFrame]:
+        """Preprocess `target` reading at most `chunksize` rows at a time.
+
+        Kinds that are not `chunkable` are preprocessed as a single chunk.
+        """
+        if not self.chunkable:
+            logger.debug(f"{self.kind} can not be preprocessed in chunks, reading {self.path} at once")
+            yield self.preprocess(target)
+            return
+        for chunk in self.read_iter(target, chunksize):
+            yield self.transform(chunk)
+
     @property
     def metadata(self) -> AsicFileMetadata:
         return AsicFileMetadata(
@@ -192,9 +291,67 @@ class AsicFile(ABC):
         )
 
     @classmethod
-    def from_remote_path(cls, remote_path: PureWindowsPath) -> Self:
+    def from_remote_path(
+        cls,
+        remote_path: PureWindowsPath,
+        size: int | None = None,
+        modified_at: dt.datetime | None = None,
+    ) -> Self:
         path_metadata = cls.extract_metadata_from_remote_path(remote_path)
-        file = cls(path=remote_path, **path_metadata.model_dump())
+        file = cls(
+            path=remote_path,
+            size=size,
+            modified_at=modified_at,
+            **path_metadata.model_dump(),
+        )
+        return file
+
+    @classmethod
+    def is_daily(cls) -> bool:
+        return "{name_day" in cls.name_template or "{location_day" in cls.location_template
+
+    @classmethod
+    def remote_path_for(
+        cls, date: dt.date, extension: str, agent: str | None = None
+    ) -> PureWindowsPath:
+        """Remote path the file of `date` and `extension` (".tx2") would have.
+
+        Built from `location_template` and `name_template`, with the literal
+        groups of the patterns (kind, ordinance, ...) taken as they are. The
+        day is ignored by monthly kinds.
+        """
+        fields = {
+            **cls.template_literals,
+            "location_year": date.year,
+            "location_month": date.month,
+            "location_day": date.day,
+            "name_year": date.year,
+            "name_month": date.month,
+            "name_day": date.day,
+            "location_agent": agent,
+            "extension": extension.removeprefix("."),
+        }
+        return PureWindowsPath(
+            cls.location_template.format(**fields) + cls.name_template.format(**fields)
+        )
+
+    @classmethod
+    def from_match_groups(
+        cls,
+        remote_path: PureWindowsPath,
+        match_groups: dict[str, Any],
+        size: int | None = None,
+        modified_at: dt.datetime | None = None,
+    ) -> Self:
+        path_metadata = cls.metadata_from_match_groups(
+            match_groups, remote_path.as_posix()
+        )
+        file = cls(
+            path=remote_path,
+            size=size,
+            modified_at=modified_at,
+            **path_metadata.model_dump(),
+        )
         return file
 
     @classmethod
@@ -208,8 +365,12 @@ class AsicFile(ABC):
             raise ValueError(
                 f"failed to extract metadata from file path {file_path_as_posix} using pattern {path_pattern}"
             )
-        match_groups = match.groupdict()
+        return cls.metadata_from_match_groups(match.groupdict(), file_path_as_posix)
 
+    @classmethod
+    def metadata_from_match_groups(
+        cls, match_groups: dict[str, Any], file_path_as_posix: str
+    ) -> AsicFileMetadataInput:
         year = match_groups.get("location_year", None)
         if year is None:
             year = match_groups["name_year"]
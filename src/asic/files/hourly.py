@@ -0,0 +1,90 @@
+import datetime as dt
+import logging
+from typing import Mapping, Sequence
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+HOUR = np.timedelta64(1, "h")
+
+HOUR_COLUMNS = [f"HORA {h:02d}" for h in range(1, 25)]
+
+
+def hour_offsets(hour_columns: Sequence[str]) -> np.ndarray:
+    """Offset from the start of the day of each "HORA 01".."HORA 24" column."""
+    return np.array([int(str(c)[-2:]) - 1 for c in hour_columns]) * HOUR
+
+
+def stack_hours(
+    frame: pd.DataFrame,
+    keys: Sequence[str],
+    date: str | dt.date,
+    value_name: str = "VALOR",
+    hour_columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Turn one column per hour into one row per hour.
+
+    Equivalent to `frame.set_index(keys).stack().reset_index()` followed by
+    `FECHA_HORA = FECHA + (int(hour_column[-2:]) - 1) hours`, but the values
+    are reshaped as a single numpy block and the keys are repeated by row
+    position instead of going through a MultiIndex and per row string parsing.
+    Missing values are dropped like `stack` does.
+
+    `date` is either the column holding the day of each row or the day of the
+    whole file. `hour_columns` defaults to every column not in `keys`.
+    Returns `FECHA_HORA`, the `keys` (except a `date` column) and `value_name`.
+    """
+    if hour_columns is None:
+        hour_columns = [c for c in frame.columns if c not in keys]
+    n_hours = len(hour_columns)
+
+    values = frame[list(hour_columns)].to_numpy().reshape(-1)
+    present = ~pd.isna(values)
+    rows = np.repeat(np.arange(len(frame)), n_hours)[present]
+    offsets = np.tile(hour_offsets(hour_columns), len(frame))[present]
+
+    if isinstance(date, str):
+        days = frame[date].to_numpy(dtype="datetime64[ns]")[rows]
+        keys = [k for k in keys if k != date]
+    else:
+        days = np.full(len(rows), np.datetime64(date, "ns"))
+
+    total = frame[list(keys)].take(rows)
+    total.insert(0, "FECHA_HORA", (days + offsets).astype("datetime64[ns]"))
+    total[value_name] = values[present]
+    return total.reset_index(drop=True)
+
+
+def stack_hour_blocks(
+    frame: pd.DataFrame,
+    keys: Sequence[str],
+    date: dt.date,
+    blocks: Mapping[str, Sequence[str]],
+) -> pd.DataFrame:
+    """Turn several blocks of hour columns into one row per hour, side by side.
+
+    Each item of `blocks` maps an output column to its 24 hour columns, all
+    blocks in the same hour order. This is the long layout a
+    `stack().unstack()` round trip over the blocks would give, without the
+    MultiIndex pivot: rows are ordered by hour and then by position in
+    `frame`, and an hour is dropped only when it is missing in every block.
+    Returns `FECHA_HORA`, the `keys` and one column per block.
+    """
+    n_rows = len(frame)
+    hour_columns = next(iter(blocks.values()))
+    # Hour-major so that FECHA_HORA comes out sorted.
+    values = {name: frame[list(c)].to_numpy().T.reshape(-1) for name, c in blocks.items()}
+    present = np.zeros(n_rows * len(hour_columns), dtype=bool)
+    for v in values.values():
+        present |= ~pd.isna(v)
+    rows = np.tile(np.arange(n_rows), len(hour_columns))[present]
+    offsets = np.repeat(hour_offsets(hour_columns), n_rows)[present]
+
+    total = frame[list(keys)].take(rows)
+    total.insert(0, "FECHA_HORA", (np.datetime64(date, "ns") + offsets).astype("datetime64[ns]"))
+    for name, v in values.items():
+        total[name] = v[present]
+    return total.reset_index(drop=True)
@@ -1,19 +1,26 @@
+import calendar
+import concurrent.futures
 import contextlib
 import datetime as dt
 import ftplib
-import functools
 import io
 import itertools
 import logging
+import os
 import pathlib
 import ssl
-from typing import Iterable, Type
+import threading
+from typing import Callable, Iterable, Iterator, NamedTuple, Sequence, Type, TypeVar
 
+import pandas as pd
 import pydantic
 
 from asic import ASIC_FILE_EXTENSION_MAP
+from asic.cache import ListingCache
+from asic.files.classifier import get_kind_classifier
 from asic.files.definitions import SUPPORTED_FILE_CLASSES
-from asic.files.file import AsicFile, FileKind
+from asic.files.file import AsicFile, FileKind, VisibilityEnum
+from asic.publication import DownloadTarget
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +29,15 @@ SSL_CONTEXT = ssl.create_default_context()
 
 SUPPORTED_ASIC_EXTENSIONS = frozenset(ASIC_FILE_EXTENSION_MAP.keys())
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 class DownloadSpec(pydantic.BaseModel):
     remote: pathlib.PureWindowsPath
     local: pathlib.Path
+    size: int | None = None
+    modified_at: dt.datetime | None = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -67,12 +79,79 @@ def get_ftps(
     return ftps
 
 
-def grab_file(ftp: ftplib.FTP, remote: pathlib.PurePath, local: pathlib.Path):
-    with open(local, "wb") as dst:
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
+
+def partial_download_path(local: pathlib.Path) -> pathlib.Path:
+    return local.with_name(local.name + PARTIAL_DOWNLOAD_SUFFIX)
+
+
+def grab_file(
+    ftp: ftplib.FTP,
+    remote: pathlib.PurePath,
+    local: pathlib.Path,
+    size: int | None = None,
+    modified_at: dt.datetime | None = None,
+) -> bool:
+    """Download `remote` into `local`, resuming a previous partial transfer.
+
+    Data is written to `local` + PARTIAL_DOWNLOAD_SUFFIX and only renamed to
+    `local` once the transfer completes. If that partial file already exists
+    (e.g. a dropped data connection) the transfer restarts from its length
+    with REST, but only when it can still be a prefix of the remote file:
+    the remote `size` must be known and not smaller than the partial, and
+    the partial must not be older than the remote `modified_at`. Otherwise
+    the partial is discarded, and so is any partial when the server refuses
+    REST.
+
+    Returns False, leaving `local` untouched, when the server replies
+    unexpectedly to the transfer.
+    """
+    partial = partial_download_path(local)
+    offset = _resume_offset(remote, partial, size, modified_at)
+    if offset == 0 or (size is not None and offset < size):
+        if offset:
+            logger.info(f"Resuming download of '{remote}' from byte {offset}")
         try:
-            ftp.retrbinary("RETR " + str(remote), dst.write)
+            _retrieve_into(ftp, remote, partial, offset)
+        except ftplib.error_perm:
+            if not offset:
+                raise
+            logger.warning(f"Failed to resume download of '{remote}', restarting it")
+            _retrieve_into(ftp, remote, partial, 0)
         except ftplib.error_reply:
             logger.exception(f"Failed to download file '{str(remote)}'")
+            return False
+    os.replace(partial, local)
+    return True
+
+
+def _resume_offset(
+    remote: pathlib.PurePath, partial: pathlib.Path, size: int | None, modified_at: dt.datetime | None
+) -> int:
+    """Length of `partial` when it can be resumed, 0 after discarding it."""
+    try:
+        stat = partial.stat()
+    except FileNotFoundError:
+        return 0
+    if size is None:
+        reason = "remote size is unknown"
+    elif stat.st_size > size:
+        reason = "it is larger than the remote file"
+    elif modified_at is not None and stat.st_mtime < modified_at.timestamp():
+        reason = "the remote file changed since"
+    else:
+        return stat.st_size
+    logger.warning(f"Discarding partial download of '{remote}', {reason}")
+    partial.unlink()
+    return 0
+
+
+def _retrieve_into(
+    ftp: ftplib.FTP, remote: pathlib.PurePath, partial: pathlib.Path, offset: int
+) -> None:
+    with open(partial, "ab" if offset else "wb") as dst:
+        ftp.retrbinary("RETR " + str(remote), dst.write, rest=offset or None)
 
 
 def grab_files(ftp: ftplib.FTP, files: Iterable[DownloadSpec]) -> None:
@@ -80,22 +159,250 @@ def grab_files(ftp: ftplib.FTP, files: Iterable[DownloadSpec]) -> None:
         grab_file(ftp, i.remote, i.local)
 
 
+def grab_spec(ftp: ftplib.FTP, spec: DownloadSpec) -> DownloadSpec | None:
+    """Download `spec`, None when the transfer failed and was logged."""
+    if not grab_file(ftp, spec.remote, spec.local, size=spec.size, modified_at=spec.modified_at):
+        return None
+    if spec.modified_at is not None:
+        # Mirror the remote modification time so later runs can detect changes
+        timestamp = spec.modified_at.timestamp()
+        os.utime(spec.local, (timestamp, timestamp))
+    return spec
+
+
+def grab_file_to_memory(ftp: ftplib.FTP, remote: pathlib.PurePath) -> io.BytesIO:
+    """Download `remote` into an in-memory buffer positioned at its start."""
+    buffer = io.BytesIO()
+    ftp.retrbinary("RETR " + str(remote), buffer.write)
+    buffer.seek(0)
+    return buffer
+
+
+def grab_spec_to_memory(ftp: ftplib.FTP, spec: DownloadSpec) -> io.BytesIO:
+    return grab_file_to_memory(ftp, spec.remote)
+
+
+def is_local_copy_current(spec: DownloadSpec) -> bool:
+    """Tell if `spec.local` already holds the remote file.
+
+    The local copy is current when its size matches the remote size and,
+    if the remote modification time is known, its mtime matches it too.
+    Without a known remote size the file is always considered changed.
+    """
+    if spec.size is None:
+        return False
+    try:
+        stat = spec.local.stat()
+    except FileNotFoundError:
+        return False
+    if stat.st_size != spec.size:
+        return False
+    if spec.modified_at is not None:
+        return int(stat.st_mtime) == int(spec.modified_at.timestamp())
+    return True
+
+
+class FTPSessionPool:
+    """Hand out one authenticated FTP session per worker thread.
+
+    Each thread lazily opens its own session with `connect` and keeps it
+    until `reconnect` replaces it, so a broken data connection on one worker
+    never stalls the others. With a single worker every task runs inline on
+    the calling thread, reusing the same session used for listing.
+    """
+
+    def __init__(self, connect: Callable[[], ftplib.FTP], workers: int = 1) -> None:
+        if workers < 1:
+            raise ValueError(f"At least one worker is required, got {workers}")
+        self.connect = connect
+        self.workers = workers
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: list[ftplib.FTP] = []
+
+    def __enter__(self) -> "FTPSessionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def session(self) -> ftplib.FTP:
+        ftp = getattr(self._local, "ftp", None)
+        if ftp is None:
+            ftp = self._open()
+        return ftp
+
+    def reconnect(self) -> ftplib.FTP:
+        stale = getattr(self._local, "ftp", None)
+        if stale is not None:
+            self._discard(stale)
+        return self._open()
+
+    def _open(self) -> ftplib.FTP:
+        ftp = self.connect()
+        self._local.ftp = ftp
+        with self._lock:
+            self._sessions.append(ftp)
+        return ftp
+
+    def _discard(self, ftp: ftplib.FTP) -> None:
+        with self._lock:
+            if ftp in self._sessions:
+                self._sessions.remove(ftp)
+        with contextlib.suppress(Exception):
+            ftp.close()
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for ftp in sessions:
+            try:
+                ftp.quit()
+            except Exception:
+                with contextlib.suppress(Exception):
+                    ftp.close()
+
+    def run(self, task: Callable[[ftplib.FTP, T], R], item: T) -> R:
+        """Run `task` on this thread's session, reconnecting once on failure."""
+        try:
+            return task(self.session(), item)
+        except Exception:
+            logger.warning("Transfer failed, retrying connection")
+            return task(self.reconnect(), item)
+
+    def map(
+        self, task: Callable[[ftplib.FTP, T], R], items: Iterable[T]
+    ) -> Iterator[tuple[T, R]]:
+        """Yield `(item, task(session, item))` as each transfer completes.
+
+        At most `workers` tasks are in flight at any time: new items are only
+        pulled from `items` as results are consumed, so a slow consumer holds
+        back the transfers instead of piling up finished results in memory.
+        """
+        if self.workers == 1:
+            for item in items:
+                yield item, self.run(task, item)
+            return
+
+        pending: dict[concurrent.futures.Future, T] = {}
+        items_iter = iter(items)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="asic-ftp"
+        ) as executor:
+            for item in itertools.islice(items_iter, self.workers):
+                pending[executor.submit(self.run, task, item)] = item
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    item = pending.pop(future)
+                    yield item, future.result()
+                    for next_item in itertools.islice(items_iter, 1):
+                        pending[executor.submit(self.run, task, next_item)] = next_item
+
+
 def get_path_version(path: pathlib.PurePath) -> str:
     version = ASIC_FILE_EXTENSION_MAP[path.suffix.lower()].normalized_version
     return version
 
 
-@functools.cache
+class RemoteEntry(NamedTuple):
+    path: pathlib.PureWindowsPath
+    size: int | None = None
+    modified_at: dt.datetime | None = None
+
+
+MLSD_UNSUPPORTED_HOSTS: set[str] = set()
+
+
+def parse_mlsd_time(value: str) -> dt.datetime:
+    # RFC 3659 time-val: YYYYMMDDHHMMSS[.sss] in UTC
+    return dt.datetime.strptime(value[:14], "%Y%m%d%H%M%S").replace(
+        tzinfo=dt.timezone.utc
+    )
+
+
+def list_mlsd_entries(ftp: ftplib.FTP) -> list[tuple[str, int | None, dt.datetime | None]]:
+    entries = []
+    for name, facts in ftp.mlsd(facts=["type", "size", "modify"]):
+        if facts.get("type", "file").lower() != "file":
+            continue
+        size = int(facts["size"]) if "size" in facts else None
+        modified_at = parse_mlsd_time(facts["modify"]) if "modify" in facts else None
+        entries.append((name, size, modified_at))
+    return entries
+
+
+def list_entries_in_location(
+    ftp: ftplib.FTP,
+    location: str,
+    cache: ListingCache | None = None,
+    refresh: bool = False,
+    use_mlsd: bool = True,
+) -> list[RemoteEntry]:
+    """List `location` with size and modification time when available.
+
+    Uses a single MLSD command to get every entry's size and modification
+    time, falling back to NLST (names only) when the server does not
+    support it. A cached names only listing is listed again when MLSD can
+    be used.
+    """
+    location_path = pathlib.PureWindowsPath(location)
+    host = getattr(ftp, "host", "")
+    detailed = use_mlsd and host not in MLSD_UNSUPPORTED_HOSTS
+    cached = None
+    if cache is not None and not refresh:
+        cached = cache.get(host, location, detailed=detailed)
+    if cached is not None:
+        entries = [
+            RemoteEntry(
+                location_path / name,
+                size,
+                dt.datetime.fromisoformat(modified_at) if modified_at is not None else None,
+            )
+            for name, size, modified_at in cached
+        ]
+    else:
+        ftp.cwd(location)
+        logger.debug(f"Listing files in location {location}")
+        listed = None
+        if detailed:
+            try:
+                listed = list_mlsd_entries(ftp)
+            except ftplib.error_perm as e:
+                logger.info(f"MLSD not supported by '{host}', falling back to NLST: {e}")
+                MLSD_UNSUPPORTED_HOSTS.add(host)
+        if listed is None:
+            detailed = False
+            listed = [(name, None, None) for name in ftp.nlst()]
+        if cache is not None:
+            cache.put(
+                host,
+                location,
+                [
+                    [name, size, modified_at.isoformat() if modified_at is not None else None]
+                    for name, size, modified_at in listed
+                ],
+                detailed=detailed,
+            )
+        entries = [
+            RemoteEntry(location_path / name, size, modified_at)
+            for name, size, modified_at in listed
+        ]
+    logger.debug(f"Total entries found in location {len(entries)}")
+    return entries
+
+
 def list_paths_in_location(
     ftp: ftplib.FTP,
     location: str,
+    cache: ListingCache | None = None,
+    refresh: bool = False,
+    use_mlsd: bool = True,
 ) -> list[pathlib.PureWindowsPath]:
-    ftp.cwd(location)
-    location_path = pathlib.PureWindowsPath(location)
-    logger.debug(f"Listing files in location {location}")
-    files_in_location = ftp.nlst()
-    logger.debug(f"Total files found in location {len(files_in_location)}")
-    paths_in_location = [location_path / f for f in files_in_location]
+    entries = list_entries_in_location(ftp, location, cache, refresh, use_mlsd)
+    paths_in_location = [e.path for e in entries]
     logger.debug(f"Total paths found in location {len(paths_in_location)}")
     return paths_in_location
 
@@ -125,6 +432,51 @@ def fiter_files_by_extension(
     return filtered
 
 
+def fiter_files_by_extensions(
+    file_list: list[AsicFile],
+    extensions: Iterable[str | None],
+) -> list[AsicFile]:
+    """Keep files matching any of `extensions` in a single pass.
+
+    A `None` among `extensions` means no extension filter at all.
+    """
+    wanted = {e.lower() if e is not None else None for e in extensions}
+    if None in wanted:
+        return list(file_list)
+    filtered: list[AsicFile] = [
+        f for f in file_list if f.extension in wanted or f.extension is None
+    ]
+    return filtered
+
+
+def keep_latest_versions(file_list: list[AsicFile]) -> list[AsicFile]:
+    """Keep only the newest version of each file in a single pass.
+
+    Files are the same file in different versions when they share kind,
+    agent, year, month and day; the newest is the extension with the highest
+    `order` in `ASIC_FILE_EXTENSION_MAP`. Files without a version (excel
+    files) are kept as they are. The listing order is preserved.
+    """
+    latest: dict[tuple, tuple[int, int]] = {}
+    for i, f in enumerate(file_list):
+        if f.version is None:
+            continue
+        key = (f.kind, f.agent, f.year, f.month, f.day)
+        order = ASIC_FILE_EXTENSION_MAP[f.extension].order
+        if key not in latest or order > latest[key][0]:
+            latest[key] = (order, i)
+
+    keep = {i for _, i in latest.values()}
+    filtered: list[AsicFile] = [
+        f for i, f in enumerate(file_list) if f.version is None or i in keep
+    ]
+    if len(filtered) < len(file_list):
+        logger.info(
+            f"Keeping the latest version of each file, skipping {len(file_list) - len(filtered)} older versions"
+        )
+    return filtered
+
+
 def list_supported_files(
     ftp: ftplib.FTP,
     *,
@@ -133,13 +485,15 @@ def list_supported_files(
     extensions: list[str],
     kinds: list[str],
     locations: list[str],
+    cache: ListingCache | None = None,
+    refresh: bool = False,
+    use_mlsd: bool = True,
 ) -> list[AsicFile]:
     logger.info("Listing files")
     file_list = []
-    for month, l_template, ext in itertools.product(
+    for month, l_template in itertools.product(
         months,
         locations,
-        extensions,
     ):
         try:
             remote_location = l_template.format(
@@ -154,13 +508,115 @@ def list_supported_files(
             continue
         logger.debug(f"Listing remote location: {remote_location}")
         files_in_location = list_supported_files_in_location(
-            ftp, remote_location, month, kinds, ext
+            ftp,
+            remote_location,
+            month,
+            kinds,
+            extensions,
+            cache=cache,
+            refresh=refresh,
+            use_mlsd=use_mlsd,
         )
         file_list.extend(files_in_location)
 
     return file_list
 
 
+def list_target_files(
+    ftp: ftplib.FTP,
+    targets: Iterable[DownloadTarget],
+    *,
+    kinds: list[str],
+    cache: ListingCache | None = None,
+    use_mlsd: bool = True,
+) -> list[AsicFile]:
+    """List the supported files of planned `targets` (see `plan_publication_targets`).
+
+    Targets come from new publications, so their cached listings are
+    refreshed; every other location is left untouched.
+    """
+    logger.info("Listing files of planned targets")
+    file_list = []
+    for target in targets:
+        logger.debug(f"Listing target {target.location} for {target.extensions}")
+        file_list.extend(
+            list_supported_files_in_location(
+                ftp,
+                target.location,
+                target.month,
+                kinds,
+                target.extensions,
+                cache=cache,
+                refresh=True,
+                use_mlsd=use_mlsd,
+            )
+        )
+    return file_list
+
+
+def synthesize_supported_files(
+    *,
+    months: list[dt.date],
+    extensions: list[str],
+    kinds: list[str],
+    agent: str | None = None,
+    until: dt.date | None = None,
+) -> list[AsicFile]:
+    """Build the files that may exist from the kind templates, without listing.
+
+    One file per kind, month and extension, and per day for daily kinds
+    (up to `until`, today by default). Sizes are unknown until probed with
+    `probe_remote_files`.
+    """
+    until = until or dt.date.today()
+    wanted = {k.lower() for k in kinds}
+    file_list: list[AsicFile] = []
+    for kind, asic_file_class in SUPPORTED_FILE_CLASSES.items():
+        if kind.lower() not in wanted:
+            continue
+        for month in months:
+            first = month.replace(day=1)
+            if asic_file_class.is_daily():
+                days_in_month = calendar.monthrange(first.year, first.month)[1]
+                dates = [first.replace(day=d) for d in range(1, days_in_month + 1)]
+            else:
+                dates = [first]
+            for date, extension in itertools.product(dates, extensions):
+                if date > until:
+                    continue
+                path = asic_file_class.remote_path_for(date, extension, agent)
+                file_list.append(asic_file_class.from_remote_path(path))
+    logger.debug(f"Synthesized {len(file_list)} candidate files")
+    return file_list
+
+
+def probe_remote_size(ftp: ftplib.FTP, path: pathlib.PurePath) -> int | None:
+    """Size of the remote `path`, None when it does not exist (a 550 reply)."""
+    try:
+        return ftp.size(str(path))
+    except ftplib.error_perm as e:
+        if str(e).startswith("550"):
+            return None
+        raise
+
+
+def probe_remote_files(ftp: ftplib.FTP, files: Sequence[AsicFile]) -> list[AsicFile]:
+    """Keep the `files` that exist on the server, with their remote size.
+
+    Each file costs a single SIZE command instead of listing its directory.
+    """
+    # SIZE is refused in ASCII mode by some servers
+    ftp.voidcmd("TYPE I")
+    found: list[AsicFile] = []
+    for f in files:
+        size = probe_remote_size(ftp, f.path)
+        if size is None:
+            logger.debug(f"Missing remote file {f.path}")
+            continue
+        found.append(type(f).from_remote_path(f.path, size=size))
+    return found
+
+
 def path_to_asic_file(
     path: pathlib.PureWindowsPath, asic_file_class: Type[AsicFile]
 ) -> AsicFile:
@@ -169,22 +625,18 @@ def path_to_asic_file(
 
 
 def cast_into_kinds(
-    paths: list[pathlib.PureWindowsPath], kinds: dict[FileKind, Type[AsicFile]]
+    paths: Sequence[pathlib.PureWindowsPath | RemoteEntry],
+    kinds: dict[FileKind, Type[AsicFile]],
 ) -> list[AsicFile]:
+    classifier = get_kind_classifier(tuple(kinds.values()))
     file_list: list[AsicFile] = []
     for p in paths:
-        for k, c in kinds.items():
-            logger.debug(f"Trying kind '{k}' for {p}")
-            try:
-                file = path_to_asic_file(p, c)
-                logger.debug(f"Found kind '{k}' for {p}")
-                file_list.append(file)
-                break
-            except ValueError:
-                logger.debug(f"Failed kind '{k}' for {p}")
-                continue
+        if isinstance(p, RemoteEntry):
+            file = classifier.cast(p.path, size=p.size, modified_at=p.modified_at)
         else:
-            logger.debug(f"Failed to match a kind to {p} in {kinds.keys()}")
+            file = classifier.cast(p)
+        if file is not None:
+            file_list.append(file)
     return file_list
 
 
@@ -193,9 +645,19 @@ def list_supported_files_in_location(
     location: str,
     month: dt.date,
     kinds: list[str],
-    extension: str,
+    extensions: Iterable[str | None],
+    cache: ListingCache | None = None,
+    refresh: bool = False,
+    use_mlsd: bool = True,
 ) -> list[AsicFile]:
-    remote_paths = list_paths_in_location(ftp, location)
+    """List the supported files of `location` for all requested extensions.
+
+    Every remote path is cast into its kind and date filtered once; the
+    requested extensions are then applied together in a single pass.
+    """
+    remote_paths = list_entries_in_location(
+        ftp, location, cache=cache, refresh=refresh, use_mlsd=use_mlsd
+    )
     logger.debug(f"Total files in location {len(remote_paths)}")
     asic_file_kinds_requested = {
         k: c for k, c in SUPPORTED_FILE_CLASSES.items() if k in kinds
@@ -212,15 +674,93 @@ def list_supported_files_in_location(
     remote_files = fiter_files_by_date_range(remote_files, since, until)
     logger.debug(f"Kept {len(remote_files)} AsicFiles by date filter")
 
-    if extension is not None:
-        logger.debug(f"Filtering by ex {len(remote_files)} files")
-        remote_files = fiter_files_by_extension(remote_files, extension)
-        logger.debug(f"Kept {len(remote_files)} AsicFiles by date filter")
+    logger.debug(f"Filtering by extensions {extensions} {len(remote_files)} files")
+    remote_files = fiter_files_by_extensions(remote_files, extensions)
+    logger.debug(f"Kept {len(remote_files)} AsicFiles by extension filter")
 
     logger.debug(f"Total files kept {len(remote_files)}")
     return remote_files
 
 
+PATH_METADATA_COLUMNS = ["path", "kind", "year", "month", "day", "extension", "version", "agent"]
+
+
+def classify_paths(
+    paths: Iterable[pathlib.PurePath],
+    kinds: list[str] | None = None,
+) -> pd.DataFrame:
+    """Classify many remote paths at once into a metadata DataFrame.
+
+    Uses vectorized string extraction with the compiled kind classifier
+    instead of building an AsicFile per path. Returns one row per supported
+    path with the columns of `PATH_METADATA_COLUMNS`; unsupported paths (or
+    unsupported versioned extensions) are dropped, as in `cast_into_kinds`.
+    """
+    classes = tuple(
+        c for k, c in SUPPORTED_FILE_CLASSES.items() if kinds is None or k in kinds
+    )
+    classifier = get_kind_classifier(classes)
+
+    path_list = list(paths)
+    posix = pd.Series([p.as_posix() for p in path_list], dtype=object)
+    if posix.empty:
+        return pd.DataFrame(columns=PATH_METADATA_COLUMNS)
+    groups = posix.str.extract(classifier.pattern)
+
+    branches = [classifier.branch_name(i) for i in range(len(classes))]
+    branch_matched = groups[branches].notna().to_numpy()
+    is_match = branch_matched.any(axis=1)
+    branch_index = branch_matched.argmax(axis=1)
+
+    def first_group(*names: str) -> pd.Series:
+        # Only the groups of the matched branch are set on each row, so the
+        # first non null column in `names` order is that branch's value.
+        columns = [
+            prefixed
+            for name in names
+            for group_names in classifier.group_names
+            for prefixed, n in group_names
+            if n == name
+        ]
+        if not columns:
+            return pd.Series(pd.NA, index=groups.index, dtype="string")
+        values = groups[columns].to_numpy(dtype=object)
+        first = pd.notna(values).argmax(axis=1)
+        return pd.Series(
+            values[range(len(values)), first], index=groups.index, dtype="string"
+        )
+
+    ext_versioned = first_group("ext_versioned").str.lower()
+    ext_excel = first_group("ext_excel").str.lower()
+    extension = "." + ext_versioned.fillna(ext_excel)
+    version_map = {e: m.normalized_version for e, m in ASIC_FILE_EXTENSION_MAP.items()}
+    version = ("." + ext_versioned).map(version_map)
+    is_supported_extension = ext_excel.notna() | version.notna()
+
+    kind_names = pd.Series([c.kind.value for c in classes], dtype=object)
+    is_agent_kind = pd.Series([c.visibility == VisibilityEnum.AGENT for c in classes])
+    agent = first_group("location_agent", "name_agent").str.lower()
+    agent = agent.where(is_agent_kind.to_numpy()[branch_index])
+
+    metadata = pd.DataFrame(
+        {
+            "path": pd.Series(path_list, dtype=object),
+            "kind": kind_names.to_numpy()[branch_index],
+            "year": first_group("location_year", "name_year"),
+            "month": first_group("location_month", "name_month"),
+            "day": first_group("location_day", "name_day"),
+            "extension": extension,
+            "version": version,
+            "agent": agent,
+        }
+    )
+    metadata = metadata[is_match & is_supported_extension.to_numpy()].reset_index(drop=True)
+    metadata["year"] = metadata["year"].astype(int)
+    metadata["month"] = metadata["month"].astype(int)
+    metadata["day"] = pd.to_numeric(metadata["day"]).astype("Int64")
+    return metadata
+
+
 def combine_patterns_and_extension(pattern: str, extension: str) -> str:
     logger.info(f"Preparing search pattern with file extension '{extension}'")
     aux_p = pattern.split(".")
@@ -0,0 +1,312 @@
+import csv
+import io
+import logging
+import re
+from html.parser import HTMLParser
+from typing import Any
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+
+logger = logging.getLogger(__name__)
+
+# Same whitespace normalization as `pd.read_html`
+WHITESPACE_REGEX = re.compile(r"[\r\n]+|\s{2,}")
+
+HIDDEN_STYLE_REGEX = re.compile(r"display:\s*none")
+
+# Strings `find(string=".+")` matches, i.e. with something else than newlines
+TEXT_REGEX = re.compile(r".+")
+
+SECTIONS = ("thead", "tbody", "tfoot")
+
+VOID_ELEMENTS = frozenset(
+    ["area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"]
+)
+
+
+class _Cell:
+    __slots__ = ("tag", "parts", "rowspan", "colspan")
+
+    def __init__(self, tag: str, attrs: dict[str, str | None]) -> None:
+        self.tag = tag
+        self.parts: list[str] = []
+        self.rowspan = int(attrs.get("rowspan") or 1)
+        self.colspan = int(attrs.get("colspan") or 1)
+
+    @property
+    def text(self) -> str:
+        return WHITESPACE_REGEX.sub(" ", "".join(self.parts).strip())
+
+
+class _Table:
+    __slots__ = ("hidden", "has_text", "closed", "rows", "_frame")
+
+    def __init__(self, hidden: bool) -> None:
+        self.hidden = hidden
+        self.has_text = False
+        self.closed = False
+        self.rows: dict[str, list[list[_Cell]]] = {s: [] for s in SECTIONS}
+        self._frame: pd.DataFrame | None = None
+
+    def frame(self) -> pd.DataFrame | None:
+        """The table as `pd.read_html` reads it, None when it skips it."""
+        if self.hidden or not self.has_text:
+            return None
+        if self._frame is None:
+            try:
+                self._frame = _table_frame(self)
+            except EmptyDataError:
+                return None
+        return self._frame
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _TableExtractor(HTMLParser):
+    """Collect the rows and cells of every table up to the one at `table_index`.
+
+    Keeps a stack with only the table structure (table, sections, rows and
+    cells), closing the elements html5lib closes implicitly, and stops as
+    soon as the wanted table and every table before it are closed.
+    """
+
+    def __init__(self, table_index: int) -> None:
+        super().__init__(convert_charrefs=True)
+        self.table_index = table_index
+        self.tables: list[_Table] = []
+        # (tag, element) with element a _Table, a row, a _Cell or None for sections
+        self.stack: list[tuple[str, Any]] = []
+        self.hidden_tag: str | None = None
+        self.hidden_depth = 0
+
+    # Structure
+
+    def _close_until(self, tags: tuple[str, ...], stop_at_table: bool = True) -> None:
+        """Pop the innermost open element in `tags` and everything above it."""
+        for i in range(len(self.stack) - 1, -1, -1):
+            tag = self.stack[i][0]
+            if tag in tags:
+                for _, element in self.stack[i:]:
+                    if isinstance(element, _Table):
+                        self._table_closed(element)
+                del self.stack[i:]
+                return
+            if stop_at_table and tag == "table":
+                return
+
+    def _table_closed(self, table: _Table) -> None:
+        table.closed = True
+        if self.found() is not None:
+            raise _StopParsing
+
+    def found(self) -> pd.DataFrame | None:
+        """The wanted table once it and every table before it are closed."""
+        index = -1
+        for table in self.tables:
+            if not table.closed:
+                return None
+            frame = table.frame()
+            if frame is not None:
+                index += 1
+                if index == self.table_index:
+                    return frame
+        return None
+
+    def _open_section(self) -> None:
+        if not self.stack or self.stack[-1][0] == "table":
+            self.stack.append(("tbody", None))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.hidden_tag is not None:
+            if tag == self.hidden_tag:
+                self.hidden_depth += 1
+            return
+        attributes = dict(attrs)
+        in_table = any(t == "table" for t, _ in self.stack)
+        if tag == "table":
+            style = (attributes.get("style") or "").replace(" ", "")
+            table = _Table(hidden="display:none" in style)
+            self.tables.append(table)
+            self.stack.append(("table", table))
+            return
+        if not in_table:
+            return
+        if self._hide(tag, attributes):
+            return
+        if tag in SECTIONS:
+            self._close_until(SECTIONS)
+            self.stack.append((tag, None))
+        elif tag == "tr":
+            self._close_until(("tr",))
+            self._open_section()
+            row: list[_Cell] = []
+            self._add_row(row)
+            self.stack.append(("tr", row))
+        elif tag in ("td", "th"):
+            self._close_until(("td", "th"))
+            if self.stack[-1][0] != "tr":
+                self.handle_starttag("tr", [])
+            cell = _Cell(tag, attributes)
+            self.stack[-1][1].append(cell)
+            self.stack.append((tag, cell))
+
+    def _hide(self, tag: str, attributes: dict[str, str | None]) -> bool:
+        """Skip elements `pd.read_html(displayed_only=True)` removes from the tables."""
+        if tag != "style" and not HIDDEN_STYLE_REGEX.search(attributes.get("style") or ""):
+            return False
+        if tag not in VOID_ELEMENTS:
+            self.hidden_tag, self.hidden_depth = tag, 1
+        return True
+
+    def _add_row(self, row: list[_Cell]) -> None:
+        # Like `table.select("thead tr")` (and tbody, tfoot) a row belongs to
+        # every enclosing table, in each section it is nested in.
+        sections: set[str] = set()
+        for tag, element in reversed(self.stack):
+            if tag in SECTIONS:
+                sections.add(tag)
+            elif tag == "table":
+                for section in sections:
+                    element.rows[section].append(row)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.hidden_tag is not None:
+            if tag == self.hidden_tag:
+                self.hidden_depth -= 1
+                if self.hidden_depth == 0:
+                    self.hidden_tag = None
+            return
+        if tag == "table":
+            self._close_until(("table",), stop_at_table=False)
+        elif tag in SECTIONS or tag in ("tr", "td", "th"):
+            self._close_until((tag,))
+
+    def handle_data(self, data: str) -> None:
+        if self.hidden_tag is not None or not self.stack:
+            return
+        in_cell = False
+        for tag, element in self.stack:
+            if tag in ("td", "th"):
+                element.parts.append(data)
+                in_cell = True
+        # Text outside of cells is moved before the table by html5lib, only
+        # whitespace stays in it.
+        if TEXT_REGEX.search(data) and (in_cell or not data.strip()):
+            for tag, element in self.stack:
+                if tag == "table":
+                    element.has_text = True
+
+    def close(self) -> None:
+        try:
+            super().close()
+            # Tables left open at the end of the page
+            for _, element in self.stack:
+                if isinstance(element, _Table):
+                    element.closed = True
+            self.stack.clear()
+        except _StopParsing:
+            pass
+
+
+def _carry(pending: tuple[int, str, int], texts: list[str], next_remainder: list[tuple[int, str, int]]) -> None:
+    """Copy the text of a cell spanning rows into `texts`, keeping it for the next row."""
+    index, text, rowspan = pending
+    texts.append(text)
+    if rowspan > 1:
+        next_remainder.append((index, text, rowspan - 1))
+
+
+def _expand(rows: list[list[_Cell]]) -> list[list[str]]:
+    """Text of each row with `rowspan` and `colspan` copied like `pd.read_html`."""
+    all_texts = []
+    remainder: list[tuple[int, str, int]] = []
+    for row in rows:
+        texts: list[str] = []
+        next_remainder: list[tuple[int, str, int]] = []
+        index = 0
+        for cell in row:
+            while remainder and remainder[0][0] <= index:
+                _carry(remainder.pop(0), texts, next_remainder)
+                index += 1
+            text = cell.text
+            for _ in range(cell.colspan):
+                texts.append(text)
+                if cell.rowspan > 1:
+                    next_remainder.append((index, text, cell.rowspan - 1))
+                index += 1
+        for pending in remainder:
+            _carry(pending, texts, next_remainder)
+        all_texts.append(texts)
+        remainder = next_remainder
+    while remainder:
+        texts, next_remainder = [], []
+        for pending in remainder:
+            _carry(pending, texts, next_remainder)
+        all_texts.append(texts)
+        remainder = next_remainder
+    return all_texts
+
+
+def _table_frame(table: _Table) -> pd.DataFrame:
+    head_rows = list(table.rows["thead"])
+    body_rows = list(table.rows["tbody"])
+    if not head_rows:
+        while body_rows and all(cell.tag == "th" for cell in body_rows[0]):
+            head_rows.append(body_rows.pop(0))
+
+    head, body, foot = _expand(head_rows), _expand(body_rows), _expand(table.rows["tfoot"])
+    header: int | list[int] | None = None
+    if head:
+        body = head + body
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(row)]
+    body += foot
+    width = max((len(row) for row in body), default=0)
+    text = io.StringIO()
+    csv.writer(text, lineterminator="\n").writerows(row + [""] * (width - len(row)) for row in body)
+    text.seek(0)
+    # The python engine parses the rows like `pd.read_html` does
+    return pd.read_csv(
+        text,
+        engine="python",
+        header=header,
+        thousands=",",
+        decimal=".",
+        keep_default_na=True,
+    )
+
+
+def read_html_table(content: bytes | str, table_index: int, encoding: str | None = None) -> pd.DataFrame:
+    """The table at `table_index` of an HTML page with the standard library parser.
+
+    Gives the same DataFrame as `pd.read_html(content, flavor="html5lib",
+    encoding=encoding)[table_index]` for well formed tables (cells, sections,
+    `colspan`/`rowspan`, `<th>` headers and hidden elements are handled the
+    same way) without building a DOM of the whole page, and stops reading
+    once the wanted table is closed.
+    """
+    if isinstance(content, bytes):
+        content = content.decode(encoding or "utf-8")
+    # html5lib normalizes newlines before tokenizing
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    extractor = _TableExtractor(table_index)
+    try:
+        extractor.feed(content)
+    except _StopParsing:
+        pass
+    else:
+        extractor.close()
+
+    frame = extractor.found()
+    if frame is None:
+        found = sum(t.frame() is not None for t in extractor.tables)
+        raise IndexError(f"Page has {found} tables, no table {table_index}")
+    return frame
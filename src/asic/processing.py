@@ -0,0 +1,252 @@
+import concurrent.futures
+import io
+import logging
+import os
+import pathlib
+import queue
+import threading
+from enum import Enum
+from pathlib import PureWindowsPath
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from asic.config import LOCAL_LOCATION_TEMPLATE
+from asic.consolidated import ConsolidatedCSV
+from asic.files.classifier import get_kind_classifier
+from asic.files.definitions import SUPPORTED_FILE_CLASSES
+from asic.files.file import AsicFile
+from asic.ftp import PARTIAL_DOWNLOAD_SUFFIX
+from asic.store import ColumnarStore
+
+logger = logging.getLogger(__name__)
+
+
+def mirror_path(f: AsicFile, destination: pathlib.Path) -> pathlib.Path:
+    """Local path of the raw file, mirroring the FTP tree under `destination`."""
+    return destination.joinpath(*f.path.relative_to(f.path.anchor).parts)
+
+
+def preprocessed_path(f: AsicFile, destination: pathlib.Path) -> pathlib.Path:
+    """Local path of the preprocessed CSV following `LOCAL_LOCATION_TEMPLATE`."""
+    subpath = LOCAL_LOCATION_TEMPLATE.format(
+        remote_parent=f.path.parent.relative_to(f.path.anchor).as_posix(),
+        normalized_version=f.normalized_version,
+        remote_name=f.path.name,
+    )
+    return destination.joinpath(subpath).with_suffix(".csv")
+
+
+def list_local_files(
+    source: pathlib.Path, kinds: Iterable[str] | None = None
+) -> list[tuple[AsicFile, pathlib.Path]]:
+    """Classify the files of `source`, a local mirror of the FTP tree.
+
+    Paths relative to `source` are matched as if they were remote paths, so
+    the layout written by `download` can be reprocessed without the server.
+    Partial downloads left to be resumed are skipped.
+    """
+    classes = SUPPORTED_FILE_CLASSES.values()
+    if kinds is not None:
+        kinds = {k.lower() for k in kinds}
+        classes = [c for c in classes if c.kind.lower() in kinds]  # type: ignore[assignment]
+    classifier = get_kind_classifier(tuple(classes))
+
+    files = []
+    for local in sorted(source.rglob("*")):
+        if not local.is_file():
+            continue
+        if local.name.endswith(PARTIAL_DOWNLOAD_SUFFIX):
+            logger.debug(f"Skipping partial download {local}")
+            continue
+        remote = PureWindowsPath("/" + local.relative_to(source).as_posix())
+        f = classifier.cast(remote)
+        if f is None:
+            logger.debug(f"Skipping unsupported local file {local}")
+            continue
+        files.append((f, local))
+    return files
+
+
+class OutputFormat(str, Enum):
+    CSV = "csv"
+    COLUMNAR = "columnar"
+    MONTHLY_CSV = "monthly-csv"
+
+
+def write_preprocessed(
+    f: AsicFile,
+    source: pathlib.Path | io.BytesIO | bytes,
+    destination: pathlib.Path,
+    create_dirs: bool = False,
+    chunksize: int | None = None,
+    output_format: OutputFormat = OutputFormat.CSV,
+) -> pathlib.Path:
+    """Preprocess `source` as `f` and write the result under `destination`.
+
+    CSV files follow `preprocessed_path`, with `chunksize` the file is read,
+    preprocessed and appended to the CSV at most `chunksize` rows at a time
+    (see `AsicFile.preprocess_iter`). The columnar output is a
+    `ColumnarStore` rooted at `destination` and the monthly CSV output a
+    `ConsolidatedCSV`, which must not be written from several processes (see
+    `preprocess_file`).
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    if output_format == OutputFormat.COLUMNAR:
+        return ColumnarStore(destination).write(f, f.preprocess(source))
+    if output_format == OutputFormat.MONTHLY_CSV:
+        return ConsolidatedCSV(destination).write(f, f.preprocess(source))
+
+    write_to = preprocessed_path(f, destination)
+
+    if create_dirs:
+        os.makedirs(write_to.parent, exist_ok=True)
+    elif not write_to.parent.is_dir():
+        raise FileNotFoundError(
+            f"Cannot save file into a non-existent directory: '{write_to.parent}'."
+            " Use the '--prepro-dirs' flag to create the folder"
+        )
+
+    if chunksize is None:
+        preprocessed = f.preprocess(source)
+        preprocessed.to_csv(
+            write_to,
+            index=False,
+            encoding="utf-8-sig",
+        )
+        return write_to
+
+    # Written aside so that a failure halfway does not leave a truncated CSV
+    partial = write_to.with_name(write_to.name + ".part")
+    with open(partial, "w", encoding="utf-8-sig", newline="") as out:
+        for i, preprocessed in enumerate(f.preprocess_iter(source, chunksize)):
+            preprocessed.to_csv(out, header=i == 0, index=False)
+    os.replace(partial, write_to)
+    return write_to
+
+
+def preprocess_file(
+    f: AsicFile, source: pathlib.Path | io.BytesIO | bytes
+) -> tuple[AsicFile, pd.DataFrame]:
+    """Preprocess `source` as `f` in a worker, leaving the writing to the caller.
+
+    Used with `PreprocessingPool(on_result=...)` when the output has a single
+    writer, like the months of a `ConsolidatedCSV`.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return f, f.preprocess(source)
+
+
+class PreprocessingPool:
+    """Run CPU bound preprocessing in worker processes with backpressure.
+
+    At most `max_pending` tasks are queued or running at any time; `submit`
+    blocks until a slot frees up. When the producer is the FTP download loop
+    this stalls the transfers instead of letting downloaded files (or
+    in-memory buffers) pile up while the CPUs fall behind.
+
+    With `processes=0` tasks run inline in the calling process.
+
+    `on_result`, when given, is called with the return value of every task in
+    the thread that calls `submit` and `join`, never in a worker.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        max_pending: int | None = None,
+        on_result: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self.processes = processes
+        self.on_result = on_result
+        self.executor: concurrent.futures.ProcessPoolExecutor | None = None
+        if processes > 0:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(processes, 1))
+        self._lock = threading.Lock()
+        self._pending: set[concurrent.futures.Future] = set()
+        self._errors: list[BaseException] = []
+        self._results: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self.completed = 0
+
+    def __enter__(self) -> "PreprocessingPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.shutdown(cancel=True)
+        else:
+            self.join()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> None:
+        self._raise_errors()
+        self._handle_results()
+        if self.executor is None:
+            result = fn(*args)
+            if self.on_result is not None:
+                self.on_result(result)
+            self.completed += 1
+            return
+        self._slots.acquire()
+        future = self.executor.submit(fn, *args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            if future.cancelled():
+                pass
+            elif future.exception() is not None:
+                self._errors.append(future.exception())  # type: ignore[arg-type]
+            elif self.on_result is not None:
+                self._results.put(future.result())
+            else:
+                self.completed += 1
+        self._slots.release()
+
+    def _handle_results(self) -> None:
+        if self.on_result is None:
+            return
+        while not self._results.empty():
+            self.on_result(self._results.get())
+            self.completed += 1
+
+    def _raise_errors(self) -> None:
+        with self._lock:
+            if self._errors:
+                raise self._errors[0]
+
+    def join(self) -> None:
+        """Wait for every submitted task and raise the first failure, if any."""
+        with self._lock:
+            pending = list(self._pending)
+        concurrent.futures.wait(pending)
+        self.shutdown()
+        self._handle_results()
+        self._raise_errors()
+
+    def shutdown(self, cancel: bool = False) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=cancel)
+
+
+def preprocessing_pool(
+    processes: int, destination: pathlib.Path, output_format: OutputFormat
+) -> PreprocessingPool:
+    """`PreprocessingPool` for `output_format`.
+
+    Workers write CSV and columnar outputs themselves (`write_preprocessed`).
+    Monthly CSVs are written by the calling process from the `preprocess_file`
+    results, so each month has a single writer.
+    """
+    if output_format != OutputFormat.MONTHLY_CSV:
+        return PreprocessingPool(processes)
+    consolidated = ConsolidatedCSV(destination)
+    return PreprocessingPool(
+        processes, on_result=lambda preprocessed: consolidated.write(*preprocessed)
+    )
@@ -1,4 +1,6 @@
 import datetime as dt
+import hashlib
+import json
 import logging
 import typing
 from io import StringIO
@@ -8,6 +10,8 @@ import pydantic
 import httpx
 
 from asic import ASIC_FILE_EXTENSION_MAP
+from asic.cache import PageCache
+from asic.html_table import read_html_table
 
 logger = logging.getLogger(__name__)
 
@@ -64,25 +68,66 @@ def get_daily_versions() -> list[ASICVersionPublication]:
     return daily_versions
 
 
-def get_monthly_pubs_table() -> pd.DataFrame:
-    headers: dict[str, str] = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["headers"]
-    url: str = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["url"]
+def parse_monthly_pubs_table(content: bytes) -> pd.DataFrame:
     source_encoding: str = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["encoding"]
     table_index: int = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["table-index"]
 
+    logger.debug("Parsing content as HTML table")
+    # Same table as `pd.read_html(content, flavor="html5lib")[table_index]`
+    versions_table = read_html_table(content, table_index, source_encoding)
+    versions_table = versions_table.dropna().T.drop_duplicates().T
+    table_headers = versions_table.iloc[0]
+    versions_table = pd.DataFrame(versions_table.values[1:], columns=table_headers)
+    return versions_table
+
+
+def get_monthly_pubs_table(cache: PageCache | None = None) -> pd.DataFrame:
+    """Fetch and parse the published versions table.
+
+    With a `cache` the page is revalidated with `If-None-Match` /
+    `If-Modified-Since`: a 304 reply, or a body with the same sha256 as the
+    cached one, reuses the cached table without parsing the HTML.
+    """
+    headers: dict[str, str] = dict(ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["headers"])
+    url: str = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["url"]
+
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        headers.update(PageCache.revalidation_headers(cached))
+
     logger.debug(f"Getting content from '{url}'")
     res = httpx.get(url, headers=headers, verify=False)
+    if res.status_code == 304 and cached is not None:
+        logger.debug(f"'{url}' not modified, using the cached table")
+        return table_from_json(cached["parsed"])
     res.raise_for_status()
 
-    html_text = typing.cast(str, res.content)
-    logger.debug("Parsing content as HTML table")
-    tables = pd.read_html(html_text, flavor="html5lib", encoding=source_encoding)
-    versions_table = tables[table_index].dropna().T.drop_duplicates().T
-    table_headers = versions_table.iloc[0]
-    versions_table = pd.DataFrame(versions_table.values[1:], columns=table_headers)
+    content_sha256 = hashlib.sha256(res.content).hexdigest()
+    if cached is not None and cached["content_sha256"] == content_sha256:
+        logger.debug(f"'{url}' content unchanged, using the cached table")
+        versions_table = table_from_json(cached["parsed"])
+    else:
+        versions_table = parse_monthly_pubs_table(res.content)
+
+    if cache is not None:
+        cache.put(
+            url,
+            etag=res.headers.get("ETag"),
+            last_modified=res.headers.get("Last-Modified"),
+            content_sha256=content_sha256,
+            parsed=table_to_json(versions_table),
+        )
     return versions_table
 
 
+def table_to_json(table: pd.DataFrame) -> dict[str, typing.Any]:
+    return json.loads(table.to_json(orient="split", index=False))
+
+
+def table_from_json(parsed: dict[str, typing.Any]) -> pd.DataFrame:
+    return pd.DataFrame(parsed["data"], columns=parsed["columns"])
+
+
 def prepare_published_versions_to_objects(
     versions_table: pd.DataFrame,
 ) -> list[ASICVersionPublication]:
@@ -139,9 +184,11 @@ def prepare_published_versions_to_objects(
 
 
 def list_latest_published_versions(
-    published_after: dt.datetime | None = None, include_daily: bool = False
+    published_after: dt.datetime | None = None,
+    include_daily: bool = False,
+    cache: PageCache | None = None,
 ) -> list[ASICVersionPublication]:
-    versions_table = get_monthly_pubs_table()
+    versions_table = get_monthly_pubs_table(cache)
     versions = prepare_published_versions_to_objects(versions_table)
     if include_daily:
         daily_versions = get_daily_versions()
@@ -153,6 +200,49 @@ def list_latest_published_versions(
     return versions
 
 
+class DownloadTarget(typing.NamedTuple):
+    """A remote location to list for some versions of one month."""
+
+    location: str
+    month: dt.date
+    extensions: tuple[str, ...]
+
+
+def plan_publication_targets(
+    publications: typing.Iterable[ASICVersionPublication],
+    location_templates: typing.Iterable[str],
+    agent: str | None = None,
+) -> list[DownloadTarget]:
+    """Turn published settlement versions into the locations to list.
+
+    Each publication (month, version) becomes its extension (".tx3") in the
+    location of that month for every template, so only the months with a
+    new version are listed, and only for the published versions. Versions of
+    the same month are grouped into a single target per location.
+    """
+    templates = sorted(set(location_templates))
+    extensions_by_month: dict[dt.date, set[str]] = {}
+    for pub in publications:
+        month = pub.month.date().replace(day=1)
+        extensions_by_month.setdefault(month, set()).add(f".{pub.version.lower()}")
+
+    targets = []
+    for month, extensions in sorted(extensions_by_month.items(), reverse=True):
+        for template in templates:
+            try:
+                location = template.format(
+                    location_year=month.year,
+                    location_month=month.month,
+                    location_agent=agent,
+                )
+            except Exception:
+                logger.warning(f"Failed to build remote location with {template}, {month, agent}")
+                continue
+            targets.append(DownloadTarget(location, month, tuple(sorted(extensions))))
+    logger.debug(f"Planned {len(targets)} targets from publications")
+    return targets
+
+
 if __name__ == "__main__":
     published_after = dt.datetime.today() - dt.timedelta(days=90)
     print(f"Keeping settlements published after {published_after}")
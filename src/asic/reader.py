@@ -1,7 +1,10 @@
 # Standard library imports
 import logging
+import os
+from enum import Enum
 from io import BytesIO, StringIO
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 # Third party imports
 import pandas as pd
@@ -11,6 +14,68 @@ pass
 
 logger = logging.getLogger(__name__)
 
+NUMERIC_POLICY_ENVVAR = "ASIC_NUMERIC_POLICY"
+
+
+class NumericPolicy(str, Enum):
+    """How the numeric columns declared in a file definition are read.
+
+    FLOAT64: as declared, `float` as float64 and `int` as int64.
+    FLOAT32: `float` columns as float32, half the memory for ~7 significant digits.
+    NULLABLE: `int` columns as the nullable Int64, so missing values do not fail.
+
+    Numeric columns missing from the definition get the type pandas infers,
+    replaced the same way, unless the definition sets `undeclared_dtype`.
+    """
+
+    FLOAT64 = "float64"
+    FLOAT32 = "float32"
+    NULLABLE = "nullable"
+
+    @classmethod
+    def from_env(cls) -> "NumericPolicy":
+        return cls(os.getenv(NUMERIC_POLICY_ENVVAR, cls.FLOAT64.value).lower())
+
+    def apply(self, dtype: dict) -> dict:
+        """Return `dtype` with the declared numeric types replaced per the policy."""
+        match self:
+            case NumericPolicy.FLOAT32:
+                replace = {float: "float32", "float": "float32", "float64": "float32"}
+            case NumericPolicy.NULLABLE:
+                replace = {int: "Int64", "int": "Int64", "int64": "Int64"}
+            case _:
+                return dtype
+        return {c: replace.get(t, t) for c, t in dtype.items()}
+
+    def coerce(
+        self, df: pd.DataFrame, declared: Iterable[str] = (), undeclared_dtype: Any = None
+    ) -> pd.DataFrame:
+        """Apply the policy to numeric columns missing from the definition.
+
+        With `undeclared_dtype` every numeric column not in `declared` is cast
+        to it, replaced per the policy, instead of keeping the inferred type:
+        a column of values that are all integers in one file is not read as
+        int64 and mixed with the declared float columns.
+        """
+        if undeclared_dtype is not None:
+            declared = set(declared)
+            undeclared = [c for c in df.select_dtypes("number").columns if c not in declared]
+            if undeclared:
+                df = df.astype(dict.fromkeys(undeclared, self.apply({"": undeclared_dtype})[""]))
+            return df
+        match self:
+            case NumericPolicy.FLOAT32:
+                columns = df.select_dtypes("float64").columns
+                dtype = "float32"
+            case NumericPolicy.NULLABLE:
+                columns = df.select_dtypes("int64").columns
+                dtype = "Int64"
+            case _:
+                return df
+        if len(columns) > 0:
+            df = df.astype(dict.fromkeys(columns, dtype))
+        return df
+
 
 class FileReader:
     """Base Class for file readers."""
@@ -20,11 +85,27 @@ class FileReader:
         logger.debug(f"Creating FileReader with file definition:\n{file_def}")
         self.file_def = file_def
 
-    def read(self, target: str | Path | StringIO | BytesIO) -> pd.DataFrame:
-        """Reads DataFrame from target."""
+    def _read_def(self, policy: NumericPolicy) -> dict:
         _def = self.file_def.copy()
+        if "dtype" in _def:
+            _def["dtype"] = policy.apply(_def["dtype"])
+        return _def
+
+    def read(
+        self,
+        target: str | Path | StringIO | BytesIO,
+        numeric_policy: NumericPolicy | None = None,
+    ) -> pd.DataFrame:
+        """Reads DataFrame from target.
+
+        Numeric columns follow `numeric_policy`, by default the one set in the
+        ASIC_NUMERIC_POLICY environment variable (float64 when unset).
+        """
+        policy = numeric_policy if numeric_policy is not None else NumericPolicy.from_env()
+        _def = self._read_def(policy)
         file_type = _def.pop("type", None)
         dt_fields = _def.pop("dt_fields", None)
+        undeclared_dtype = _def.pop("undeclared_dtype", None)
 
         logger.debug(f"Reading as {file_type}: {target}")
 
@@ -44,11 +125,41 @@ class FileReader:
 
         if dt_fields is not None:
             res = self._date_converter(res, dt_fields)
+        res = policy.coerce(res, _def.get("dtype", {}), undeclared_dtype)
 
         logger.info(f"Read {res.shape[0]} rows and {res.shape[1]} columns")
         # logger.debug(f"Dtypes of result DataFrame:\n{res.dtypes}")
         return res
 
+    def read_iter(
+        self,
+        target: str | Path | StringIO | BytesIO,
+        chunksize: int,
+        numeric_policy: NumericPolicy | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Reads target as DataFrames of at most `chunksize` rows.
+
+        Only delimited text is streamed, Excel files are read in one chunk.
+        """
+        policy = numeric_policy if numeric_policy is not None else NumericPolicy.from_env()
+        _def = self._read_def(policy)
+        file_type = _def.pop("type", None)
+        dt_fields = _def.pop("dt_fields", None)
+        undeclared_dtype = _def.pop("undeclared_dtype", None)
+
+        if file_type not in ["csv", "txt", "tsv"]:
+            yield self.read(target, policy)
+            return
+
+        logger.debug(f"Reading as {file_type} in chunks of {chunksize} rows: {target}")
+        with pd.read_csv(target, chunksize=chunksize, **_def) as chunks:
+            for res in chunks:
+                if dt_fields is not None:
+                    res = self._date_converter(res, dt_fields)
+                res = policy.coerce(res, _def.get("dtype", {}), undeclared_dtype)
+                logger.debug(f"Read chunk of {res.shape[0]} rows and {res.shape[1]} columns")
+                yield res
+
     def _date_converter(self, df: pd.DataFrame, dt_fields: dict) -> pd.DataFrame:
         for c in dt_fields:
             df[c] = pd.to_datetime(df[c], format=dt_fields[c].get("format"))
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import pathlib
+import shutil
+from typing import Any, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from asic.files.file import AsicFile
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILENAME = "schema.json"
+
+STORE_FORMAT_VERSION = 1
+
+
+class ColumnarStore:
+    """Preprocessed frames stored as one numpy array per column.
+
+    Each preprocessed file is a part directory under
+    `{root}/{kind}/{year}/{month}/{normalized_version}/{remote stem}/` with a
+    `schema.json` sidecar and a `.npy` per column, so columns can be loaded
+    with `np.load(mmap_mode="r")` without parsing text:
+
+    - numeric and datetime columns are stored as they are ("plain"),
+    - categorical and string columns as integer codes plus the categories in
+      the schema ("dictionary", missing values are code -1),
+    - nullable extension columns (Int64, ...) as their values plus a boolean
+      mask ("masked").
+    """
+
+    def __init__(self, root: pathlib.Path) -> None:
+        self.root = root
+
+    def partition_path(
+        self, kind: str, year: int, month: int, normalized_version: str
+    ) -> pathlib.Path:
+        return self.root / kind.lower() / f"{year:04d}" / f"{month:02d}" / normalized_version
+
+    def part_path(self, f: AsicFile) -> pathlib.Path:
+        partition = self.partition_path(f.kind, f.year, f.month, f.normalized_version)
+        return partition / f.path.stem.lower()
+
+    def write(self, f: AsicFile, frame: pd.DataFrame) -> pathlib.Path:
+        """Store `frame`, the preprocessed `f`, replacing a previous copy."""
+        part = self.part_path(f)
+        # Written aside and renamed so readers never see a half written part
+        partial = part.with_name(part.name + ".part")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        columns = []
+        for i, (name, series) in enumerate(frame.items()):
+            column = {"name": str(name), "file": f"c{i}.npy", **_encode(series, partial / f"c{i}")}
+            columns.append(column)
+        schema = {
+            "format_version": STORE_FORMAT_VERSION,
+            "kind": str(f.kind.value),
+            "source": str(f.path),
+            "rows": len(frame),
+            "columns": columns,
+        }
+        with open(partial / SCHEMA_FILENAME, "w", encoding="utf-8") as out:
+            json.dump(schema, out, ensure_ascii=False, indent=1)
+
+        shutil.rmtree(part, ignore_errors=True)
+        os.replace(partial, part)
+        logger.debug(f"Stored {len(frame)} rows of {f.path} in {part}")
+        return part
+
+    def parts(
+        self,
+        kind: str,
+        year: int | None = None,
+        month: int | None = None,
+        normalized_version: str | None = None,
+    ) -> list[pathlib.Path]:
+        """Part directories of `kind`, optionally narrowed to a partition."""
+        pattern = "/".join(
+            [
+                f"{year:04d}" if year is not None else "*",
+                f"{month:02d}" if month is not None else "*",
+                normalized_version if normalized_version is not None else "*",
+                "*",
+                SCHEMA_FILENAME,
+            ]
+        )
+        schemas = (self.root / kind.lower()).glob(pattern)
+        return sorted(p.parent for p in schemas if not p.parent.name.endswith(".part"))
+
+    def read_part(
+        self, part: pathlib.Path, columns: Sequence[str] | None = None, mmap: bool = True
+    ) -> pd.DataFrame:
+        """Load a part, memory mapping its column files when `mmap`."""
+        return pd.DataFrame(self._read_columns(part, columns, mmap), copy=False)
+
+    def _read_columns(
+        self, part: pathlib.Path, columns: Sequence[str] | None, mmap: bool
+    ) -> dict[str, Any]:
+        with open(part / SCHEMA_FILENAME, encoding="utf-8") as schema_file:
+            schema = json.load(schema_file)
+        mmap_mode = "r" if mmap else None
+        return {
+            column["name"]: _decode(column, part, mmap_mode)
+            for column in schema["columns"]
+            if columns is None or column["name"] in columns
+        }
+
+    def read(
+        self,
+        kind: str,
+        year: int | None = None,
+        month: int | None = None,
+        normalized_version: str | None = None,
+        columns: Sequence[str] | None = None,
+        mmap: bool = True,
+    ) -> pd.DataFrame:
+        """Concatenate every part of `kind` in the selected partitions.
+
+        Each column is concatenated once across parts. With a single part the
+        columns stay memory mapped.
+        """
+        parts = self.parts(kind, year, month, normalized_version)
+        if len(parts) == 1:
+            return self.read_part(parts[0], columns, mmap)
+
+        arrays: dict[str, list[Any]] = {}
+        for part in parts:
+            for name, array in self._read_columns(part, columns, mmap).items():
+                arrays.setdefault(name, []).append(array)
+        if not arrays:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        return pd.DataFrame({name: _concat(a) for name, a in arrays.items()}, copy=False)
+
+
+def _encode(series: pd.Series, stem: pathlib.Path) -> dict[str, Any]:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _encode_dictionary(
+            series.cat.codes.to_numpy(), series.cat.categories, stem
+        )
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        codes, categories = pd.factorize(series, use_na_sentinel=True)
+        return _encode_dictionary(codes, categories, stem)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)  # type: ignore[attr-defined]
+        np.save(stem.with_suffix(".npy"), values)
+        np.save(stem.with_suffix(".mask.npy"), mask)
+        return {"encoding": "masked", "dtype": str(dtype), "mask": stem.name + ".mask.npy"}
+    np.save(stem.with_suffix(".npy"), series.to_numpy())
+    return {"encoding": "plain", "dtype": str(dtype)}
+
+
+def _encode_dictionary(codes: np.ndarray, categories: pd.Index, stem: pathlib.Path) -> dict[str, Any]:
+    np.save(stem.with_suffix(".npy"), codes.astype(np.min_scalar_type(-max(len(categories), 1))))
+    return {"encoding": "dictionary", "dtype": "category", "categories": categories.tolist()}
+
+
+def _decode(column: dict[str, Any], part: pathlib.Path, mmap_mode: str | None) -> Any:
+    values = np.load(part / column["file"], mmap_mode=mmap_mode)  # type: ignore[arg-type]
+    match column["encoding"]:
+        case "plain":
+            return values
+        case "dictionary":
+            return pd.Categorical.from_codes(values, categories=column["categories"])
+        case "masked":
+            mask = np.load(part / column["mask"], mmap_mode=mmap_mode)  # type: ignore[arg-type]
+            dtype = pd.api.types.pandas_dtype(column["dtype"])
+            assert isinstance(dtype, pd.api.extensions.ExtensionDtype)
+            # A masked array type (IntegerArray, FloatingArray, BooleanArray)
+            array_type: Any = dtype.construct_array_type()
+            return array_type(values, mask)
+        case _:
+            raise ValueError(f"Unsupported column encoding '{column['encoding']}'")
+
+
+def _concat(arrays: list[Any]) -> Any:
+    if all(isinstance(a, np.ndarray) for a in arrays):
+        return np.concatenate(arrays)
+    if all(isinstance(a, pd.Categorical) for a in arrays):
+        return union_categoricals(arrays)
+    return pd.concat([pd.Series(a, copy=False) for a in arrays], ignore_index=True).array
@@ -5,6 +5,7 @@ Use the generic agents XXXC, XXXG, XXXD or XXXT for agent (private) test files.
 
 Make sure that the path casing (UPPERCASE, lowerase, etc) is as the local file system.
 """
+import ftplib
 import pathlib
 
 import pytest
@@ -172,3 +173,89 @@ ALL_FILES = {
         "agent": None,
     },
 }
+
+
+class FakeFTP:
+    """In-memory stand-in for `ftplib.FTP` serving `files` keyed by remote path."""
+
+    MODIFY = "20231102030405"
+
+    def __init__(
+        self,
+        files: dict[str, bytes],
+        host: str = "fake.ftp",
+        fail_once: bool = False,
+        mlsd: bool = False,
+        fail_after: int | None = None,
+    ):
+        self.files = files
+        self.host = host
+        self.fail_once = fail_once
+        self.mlsd_supported = mlsd
+        self.fail_after = fail_after
+        self.commands: list[str] = []
+        self.closed = False
+        self.location = "/"
+
+    def retrbinary(self, cmd: str, callback, blocksize: int = 8192, rest=None):
+        if rest is not None:
+            self.commands.append(f"REST {rest}")
+        self.commands.append(cmd)
+        if self.fail_once:
+            self.fail_once = False
+            raise ConnectionResetError("data connection dropped")
+        data = self._data(cmd.removeprefix("RETR "))[int(rest or 0) :]
+        if self.fail_after is not None:
+            callback(data[: self.fail_after])
+            self.fail_after = None
+            raise ConnectionResetError("data connection dropped")
+        for i in range(0, len(data), blocksize):
+            callback(data[i : i + blocksize])
+        return "226 Transfer complete"
+
+    def cwd(self, location: str):
+        self.commands.append(f"CWD {location}")
+        self.location = location
+
+    def _names_in_location(self):
+        location = pathlib.PureWindowsPath(self.location)
+        return [
+            pathlib.PureWindowsPath(p).name
+            for p in self.files
+            if pathlib.PureWindowsPath(p).parent == location
+        ]
+
+    def nlst(self):
+        self.commands.append("NLST")
+        return self._names_in_location()
+
+    def mlsd(self, path: str = "", facts=()):
+        self.commands.append("MLSD")
+        if not self.mlsd_supported:
+            raise ftplib.error_perm("500 Syntax error, command unrecognized.")
+        yield ".", {"type": "cdir"}
+        for name in self._names_in_location():
+            data = self.files[str(pathlib.PureWindowsPath(self.location) / name)]
+            yield name, {"type": "file", "size": str(len(data)), "modify": self.MODIFY}
+
+    def voidcmd(self, cmd: str):
+        self.commands.append(cmd)
+        return "200 Type set to I"
+
+    def _data(self, filename: str) -> bytes:
+        # Paths are case insensitive on the server
+        wanted = str(pathlib.PureWindowsPath(filename)).lower()
+        for path, data in self.files.items():
+            if path.lower() == wanted:
+                return data
+        raise ftplib.error_perm(f"550 {filename}: The system cannot find the file specified.")
+
+    def size(self, filename: str):
+        self.commands.append(f"SIZE {filename}")
+        return len(self._data(filename))
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
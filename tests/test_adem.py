@@ -1,5 +1,8 @@
+import io
+import logging
 import pathlib
 
+import pytest
 from pytest import fixture
 
 from asic.files.definitions.adem import ADEM
@@ -40,3 +43,33 @@ def test_adem_preprocess(adem_file: ADEM, local_adem_file):
     long_data = adem_file.preprocess(local_adem_file)
     print(len(long_data))
     assert len(long_data) == 1536
+
+
+def test_adem_preprocess_missing_code(adem_file: ADEM, caplog):
+    header = ";".join(["CODIGO", "AGENTE", "CONTENIDO"] + [f"HORA {h:02d}" for h in range(1, 25)])
+    rows = [
+        ";".join(["DMRE", agent, "Demanda regulada"] + ["1.5"] * 24)
+        for agent in ["BBBB", "AAAA"]
+    ]
+    target = io.BytesIO("\n".join([header, *rows]).encode("cp1252"))
+
+    with caplog.at_level(logging.WARNING):
+        long_data = adem_file.preprocess(target)
+
+    assert len(long_data) == 48
+    assert long_data["AGENTE"].tolist()[:2] == ["AAAA", "BBBB"]
+    assert (long_data["DMRE_VALOR"] == 1.5).all()
+    assert long_data[["PRRE_VALOR", "DMNR_VALOR", "PRNR_VALOR"]].isna().all().all()
+    assert "No PRRE rows" in caplog.text
+
+
+def test_adem_preprocess_repeated_agent(adem_file: ADEM):
+    header = ";".join(["CODIGO", "AGENTE", "CONTENIDO"] + [f"HORA {h:02d}" for h in range(1, 25)])
+    rows = [
+        ";".join(["DMRE", agent, "Demanda regulada"] + ["1.5"] * 24)
+        for agent in ["AAAA", "BBBB", "AAAA"]
+    ]
+    target = io.BytesIO("\n".join([header, *rows]).encode("cp1252"))
+
+    with pytest.raises(ValueError, match=r"more than one DMRE row for agents \['AAAA'\]"):
+        adem_file.preprocess(target)
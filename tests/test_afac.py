@@ -1,8 +1,10 @@
 import pathlib
 
+import pytest
 from pytest import fixture
 
 from asic.files.definitions.afac import AFAC
+from asic.reader import NUMERIC_POLICY_ENVVAR
 
 from .conftest import ALL_FILES, TESTFILES
 
@@ -39,3 +41,17 @@ def test_afac_read(afac_file: AFAC, local_afac_file):
 def test_afac_preprocess(afac_file: AFAC, local_afac_file):
     long_data = afac_file.preprocess(local_afac_file)
     assert len(long_data) == 1035
+
+
+@TESTFILES
+@pytest.mark.parametrize(
+    "policy,expected", [("float64", "float64"), ("float32", "float32"), ("nullable", "float64")]
+)
+def test_afac_numeric_policy(afac_file: AFAC, local_afac_file, monkeypatch, policy, expected):
+    # The fixture has integer columns the definition does not declare
+    monkeypatch.setenv(NUMERIC_POLICY_ENVVAR, policy)
+    data = afac_file.read(local_afac_file)
+    assert {str(t) for c, t in data.dtypes.items() if c != "AGENTE"} == {expected}
+
+    long_data = afac_file.preprocess(local_afac_file)
+    assert str(long_data["VALOR"].dtype) == expected
@@ -0,0 +1,84 @@
+import datetime as dt
+import pathlib
+
+import asic.ftp as ftp_module
+from asic.cache import ListingCache, location_month
+
+from .conftest import FakeFTP
+
+NOW = dt.datetime(2023, 11, 15, 12, 0)
+PAST_LOCATION = "/RUTA/PUBLICA/DEL/FTP/2023-10/"
+CURRENT_LOCATION = "/RUTA/PUBLICA/DEL/FTP/2023-11/"
+
+
+def test_location_month():
+    assert location_month(PAST_LOCATION) == dt.date(2023, 10, 1)
+    assert location_month("/RUTA/PUBLICA/DEL/FTP/SUB_RUTA/SUB_RUTA_1/") is None
+
+
+def test_listing_cache_roundtrip(tmp_path: pathlib.Path):
+    cache = ListingCache.in_dir(tmp_path / "cache")
+    assert cache.get("host", PAST_LOCATION, now=NOW) is None
+    cache.put("host", PAST_LOCATION, ["adem1001.tx2"], now=NOW)
+    assert cache.get("host", PAST_LOCATION, now=NOW) == ["adem1001.tx2"]
+    assert cache.get("other-host", PAST_LOCATION, now=NOW) is None
+    # A new instance reads the same persisted listing
+    assert ListingCache.in_dir(tmp_path / "cache").get("host", PAST_LOCATION, now=NOW) == ["adem1001.tx2"]
+
+
+def test_listing_cache_expiration(tmp_path: pathlib.Path):
+    cache = ListingCache.in_dir(tmp_path, current_month_ttl=dt.timedelta(minutes=30))
+    cache.put("host", PAST_LOCATION, ["adem1001.tx2"], now=NOW)
+    cache.put("host", CURRENT_LOCATION, ["adem1101.tx1"], now=NOW)
+
+    later = NOW + dt.timedelta(days=60)
+    assert cache.get("host", PAST_LOCATION, now=later) == ["adem1001.tx2"]
+    assert cache.get("host", CURRENT_LOCATION, now=NOW + dt.timedelta(minutes=10)) == ["adem1101.tx1"]
+    assert cache.get("host", CURRENT_LOCATION, now=NOW + dt.timedelta(minutes=31)) is None
+
+
+def test_list_paths_in_location_uses_cache(tmp_path: pathlib.Path):
+    files = {"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx2": b""}
+    cache = ListingCache.in_dir(tmp_path)
+
+    first = FakeFTP(files)
+    paths = ftp_module.list_paths_in_location(first, PAST_LOCATION, cache=cache)  # type: ignore[arg-type]
+    assert paths == [pathlib.PureWindowsPath(p) for p in files]
+    assert "NLST" in first.commands
+
+    second = FakeFTP(files)
+    assert ftp_module.list_paths_in_location(second, PAST_LOCATION, cache=cache) == paths  # type: ignore[arg-type]
+    assert second.commands == []
+
+    ftp_module.list_paths_in_location(second, PAST_LOCATION, cache=cache, refresh=True)  # type: ignore[arg-type]
+    assert "NLST" in second.commands
+
+
+def test_cached_entries_keep_size_and_modification_time(tmp_path: pathlib.Path):
+    files = {"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx2": b"1234"}
+    cache = ListingCache.in_dir(tmp_path)
+    listed = ftp_module.list_entries_in_location(FakeFTP(files, host="mlsd.ftp", mlsd=True), PAST_LOCATION, cache=cache)  # type: ignore[arg-type]
+    cached = ftp_module.list_entries_in_location(FakeFTP({}, host="mlsd.ftp"), PAST_LOCATION, cache=cache)  # type: ignore[arg-type]
+    assert cached == listed
+    assert cached[0].size == 4
+
+
+def test_names_only_listing_is_listed_again_with_mlsd(tmp_path: pathlib.Path):
+    files = {"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx2": b"1234"}
+    cache = ListingCache.in_dir(tmp_path)
+
+    names_only = ftp_module.list_entries_in_location(
+        FakeFTP(files, host="mlsd.ftp", mlsd=True), PAST_LOCATION, cache=cache, use_mlsd=False  # type: ignore[arg-type]
+    )
+    assert names_only[0].size is None
+
+    ftp = FakeFTP(files, host="mlsd.ftp", mlsd=True)
+    listed = ftp_module.list_entries_in_location(ftp, PAST_LOCATION, cache=cache)  # type: ignore[arg-type]
+    assert "MLSD" in ftp.commands
+    assert listed[0].size == 4
+    assert listed[0].modified_at is not None
+
+    # The detailed listing replaced the names only one, also for --no-mlsd runs
+    ftp = FakeFTP(files, host="mlsd.ftp", mlsd=True)
+    assert ftp_module.list_entries_in_location(ftp, PAST_LOCATION, cache=cache, use_mlsd=False) == listed  # type: ignore[arg-type]
+    assert ftp.commands == []
@@ -0,0 +1,86 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+from asic.files.classifier import SUPPORTED_FILE_CLASSIFIER, get_kind_classifier
+from asic.files.definitions import SUPPORTED_FILE_CLASSES
+from asic.files.file import FileKind
+from asic.ftp import PATH_METADATA_COLUMNS, classify_paths
+from tests.conftest import ALL_FILES
+
+
+@pytest.mark.parametrize(
+    "remote_path,expected",
+    [(v["path"], v) for k, v in ALL_FILES.items()],
+)
+def test_classify_matches_from_remote_path(remote_path, expected):
+    path = pathlib.PureWindowsPath(remote_path)
+    classified = SUPPORTED_FILE_CLASSIFIER.classify(path)
+    assert classified is not None
+    asic_class, match_groups = classified
+    assert asic_class.kind == expected["kind"]
+
+    file = SUPPORTED_FILE_CLASSIFIER.cast(path)
+    reference = SUPPORTED_FILE_CLASSES[expected["kind"]].from_remote_path(path)
+    assert file is not None
+    assert file.metadata == reference.metadata
+
+
+def test_classify_unsupported_path():
+    path = pathlib.PureWindowsPath("/RUTA/PUBLICA/DEL/FTP/2023-10/cliq1001.tx2")
+    assert SUPPORTED_FILE_CLASSIFIER.classify(path) is None
+    assert SUPPORTED_FILE_CLASSIFIER.cast(path) is None
+
+
+def test_classify_unsupported_extension():
+    path = pathlib.PureWindowsPath("/RUTA/PUBLICA/DEL/FTP/2023-10/adem1001.zip")
+    assert SUPPORTED_FILE_CLASSIFIER.classify(path) is not None
+    assert SUPPORTED_FILE_CLASSIFIER.cast(path) is None
+
+
+def test_classifier_restricted_to_kinds():
+    classifier = get_kind_classifier((SUPPORTED_FILE_CLASSES[FileKind.TSERV],))
+    assert classifier.kinds == [FileKind.TSERV]
+    path = pathlib.PureWindowsPath(ALL_FILES["adem"]["path"])
+    assert classifier.classify(path) is None
+
+
+def test_classify_paths_matches_per_path_metadata():
+    paths = [pathlib.PureWindowsPath(v["path"]) for v in ALL_FILES.values()]
+    unsupported = [
+        pathlib.PureWindowsPath("/RUTA/PUBLICA/DEL/FTP/2023-10/cliq1001.tx2"),
+        pathlib.PureWindowsPath("/RUTA/PUBLICA/DEL/FTP/2023-10/adem1001.zip"),
+    ]
+    metadata = classify_paths(unsupported + paths)
+
+    assert list(metadata.columns) == PATH_METADATA_COLUMNS
+    assert len(metadata) == len(paths)
+    for row, expected in zip(metadata.itertuples(index=False), ALL_FILES.values(), strict=True):
+        assert row.path == pathlib.PureWindowsPath(expected["path"])
+        assert row.kind == expected["kind"]
+        assert row.year == expected["year"]
+        assert row.month == expected["month"]
+        if expected["day"] is None:
+            assert row.day is pd.NA
+        else:
+            assert row.day == expected["day"]
+        assert row.extension == expected["extension"]
+        assert row.version == expected["version"]
+        if expected["agent"] is None:
+            assert pd.isna(row.agent)
+        else:
+            assert row.agent == expected["agent"]
+
+
+def test_classify_paths_restricted_to_kinds():
+    paths = [pathlib.PureWindowsPath(v["path"]) for v in ALL_FILES.values()]
+    metadata = classify_paths(paths, kinds=["adem", "tserv"])
+    assert sorted(metadata["kind"]) == ["adem", "tserv"]
+    assert classify_paths([]).empty
+
+
+def test_classify_paths_is_anchored():
+    path = pathlib.PureWindowsPath("/OTRA" + ALL_FILES["adem"]["path"])
+    assert SUPPORTED_FILE_CLASSIFIER.classify(path) is None
+    assert classify_paths([path]).empty
@@ -0,0 +1,96 @@
+import pathlib
+import threading
+
+import pandas as pd
+import pytest
+
+from asic.consolidated import ConsolidatedCSV
+from asic.files.definitions.trsd import TRSD
+from asic.processing import OutputFormat, list_local_files, preprocess_file, preprocessing_pool
+
+from .conftest import TESTFILES
+
+
+def trsd_day(day: str) -> TRSD:
+    return TRSD.from_remote_path(pathlib.PureWindowsPath(f"/RUTA/PUBLICA/DEL/FTP/2023-10/trsd10{day}.tx2"))
+
+
+def prices(day: str, n: int, price: float) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "FECHA_HORA": pd.date_range(f"2023-10-{day}", periods=n, freq="h"),
+            "CODIGO": [f"C{i:02d}" for i in range(n)],
+            "PRECIO": [price + i for i in range(n)],
+        }
+    )
+
+
+def test_consolidated_slices_in_day_order(tmp_path: pathlib.Path):
+    consolidated = ConsolidatedCSV(tmp_path)
+    for day in ["03", "01", "02"]:
+        path = consolidated.write(trsd_day(day), prices(day, 3, float(day)))
+
+    assert path == tmp_path / "trsd" / "2023" / "10" / "001.csv"
+    index = consolidated.read_index(path)
+    assert index is not None
+    assert [s["key"] for s in index["slices"]] == ["trsd1001", "trsd1002", "trsd1003"]
+
+    month = pd.read_csv(path, encoding="utf-8-sig", parse_dates=["FECHA_HORA"])
+    expected = pd.concat([prices(day, 3, float(day)) for day in ["01", "02", "03"]], ignore_index=True)
+    pd.testing.assert_frame_equal(month, expected)
+    second = consolidated.read_slice(path, "trsd1002")
+    pd.testing.assert_frame_equal(second, prices("02", 3, 2.0).astype({"FECHA_HORA": str}))
+
+
+def test_consolidated_replaces_only_the_slice_and_tail(tmp_path: pathlib.Path):
+    consolidated = ConsolidatedCSV(tmp_path)
+    for day in ["01", "02", "03"]:
+        path = consolidated.write(trsd_day(day), prices(day, 3, float(day)))
+    before = path.read_bytes()
+    first_end = consolidated.read_index(path)["slices"][0]["end"]  # type: ignore[index]
+
+    # A revised day with more rows
+    consolidated.write(trsd_day("02"), prices("02", 5, 20.0))
+
+    after = path.read_bytes()
+    assert after[:first_end] == before[:first_end]
+    month = pd.read_csv(path, encoding="utf-8-sig", parse_dates=["FECHA_HORA"])
+    expected = pd.concat([prices("01", 3, 1.0), prices("02", 5, 20.0), prices("03", 3, 3.0)], ignore_index=True)
+    pd.testing.assert_frame_equal(month, expected)
+    assert [s["rows"] for s in consolidated.read_index(path)["slices"]] == [3, 5, 3]  # type: ignore[index]
+
+
+def test_consolidated_rejects_other_columns_and_stale_index(tmp_path: pathlib.Path):
+    consolidated = ConsolidatedCSV(tmp_path)
+    path = consolidated.write(trsd_day("01"), prices("01", 3, 1.0))
+    with pytest.raises(ValueError, match="do not match the columns"):
+        consolidated.write(trsd_day("02"), prices("02", 3, 2.0).drop(columns="CODIGO"))
+
+    with open(path, "ab") as out:
+        out.write(b"half written\n")
+    with pytest.raises(ValueError, match="does not match its index"):
+        consolidated.write(trsd_day("02"), prices("02", 3, 2.0))
+
+
+@TESTFILES
+def test_monthly_csv_written_by_the_calling_thread(datafiles: pathlib.Path, tmp_path: pathlib.Path):
+    writers = set()
+    files = list_local_files(datafiles)
+    with preprocessing_pool(2, tmp_path, OutputFormat.MONTHLY_CSV) as pool:
+        consolidated_write = pool.on_result
+        assert consolidated_write is not None
+
+        def on_result(preprocessed):
+            writers.add(threading.get_ident())
+            consolidated_write(preprocessed)
+
+        pool.on_result = on_result
+        for f, local in files:
+            pool.submit(preprocess_file, f, local)
+
+    assert writers == {threading.get_ident()}
+    assert pool.completed == len(files)
+    consolidated = ConsolidatedCSV(tmp_path)
+    for f, local in files:
+        written = consolidated.read_slice(consolidated.file_path(f), f.path.stem)
+        assert len(written) == len(f.preprocess(local))
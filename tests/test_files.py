@@ -1,9 +1,11 @@
 import pathlib
 
+import pandas as pd
 import pytest
 
 from asic.files.definitions import SUPPORTED_FILE_CLASSES
-from tests.conftest import ALL_FILES
+from asic.files.file import pattern_to_template
+from tests.conftest import ALL_FILES, TESTFILES
 
 pytestmark = pytest.mark.parametrize(
     "remote_path,expected",
@@ -25,3 +27,35 @@ def test_file_from_remote_path(remote_path, expected):
     assert file.extension == expected["extension"]
     assert file.version == expected["version"]
     assert file.agent == expected["agent"]
+
+
+def test_file_is_a_slotted_record(remote_path, expected):
+    path = pathlib.PureWindowsPath(remote_path)
+    asic_class = SUPPORTED_FILE_CLASSES[expected["kind"]]
+    file = asic_class.from_remote_path(path)
+    other = asic_class.from_remote_path(path)
+    assert not hasattr(file, "__dict__")
+    assert file.reader is other.reader is asic_class.reader
+    assert file.name_template == pattern_to_template(asic_class.name_pattern)
+    assert file.location_template == pattern_to_template(asic_class.location_pattern)
+
+
+@TESTFILES
+def test_preprocess_iter_matches_preprocess(remote_path, expected, datafiles: pathlib.Path):
+    path = pathlib.PureWindowsPath(remote_path)
+    file = SUPPORTED_FILE_CLASSES[expected["kind"]].from_remote_path(path)
+    local = datafiles / path.relative_to(path.anchor)
+
+    chunks = list(file.preprocess_iter(local, chunksize=7))
+    whole = file.preprocess(local)
+    if not file.chunkable:
+        assert len(chunks) == 1
+    # Chunks keep the rows and their order within each chunk, not the global
+    # order of kinds laid out hour-major (DSPCTTOS). Categorical columns only
+    # hold the categories seen in each chunk.
+    columns = list(whole.columns)
+    chunks = [c.astype(whole.dtypes.to_dict()) for c in chunks]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True).sort_values(columns, ignore_index=True),
+        whole.sort_values(columns, ignore_index=True),
+    )
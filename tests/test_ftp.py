@@ -0,0 +1,296 @@
+import datetime as dt
+import ftplib
+import os
+import pathlib
+import threading
+
+import asic.ftp as ftp_module
+from asic.files.definitions.adem import ADEM
+from asic.ftp import DownloadSpec, FTPSessionPool, grab_spec, is_local_copy_current
+
+from .conftest import FakeFTP
+
+REMOTE_FILES = {
+    f"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem10{d:02d}.tx2": f"day {d}".encode()
+    for d in range(1, 11)
+}
+
+
+def test_session_pool_one_session_per_worker(tmp_path: pathlib.Path):
+    sessions: list[FakeFTP] = []
+    threads: set[int] = set()
+
+    def connect():
+        ftp = FakeFTP(REMOTE_FILES)
+        sessions.append(ftp)
+        return ftp
+
+    def task(ftp, spec):
+        threads.add(threading.get_ident())
+        return grab_spec(ftp, spec)
+
+    specs = [
+        DownloadSpec(remote=pathlib.PureWindowsPath(r), local=tmp_path / pathlib.PureWindowsPath(r).name)
+        for r in REMOTE_FILES
+    ]
+    with FTPSessionPool(connect, workers=3) as pool:
+        done = [spec for spec, _ in pool.map(task, specs)]
+
+    assert sorted(s.local for s in done) == sorted(s.local for s in specs)
+    assert len(sessions) == len(threads) <= 3
+    assert all(s.closed for s in sessions)
+    for spec in specs:
+        assert spec.local.read_bytes() == REMOTE_FILES[str(spec.remote)]
+
+
+def test_session_pool_reconnects_failed_worker(tmp_path: pathlib.Path):
+    sessions: list[FakeFTP] = []
+
+    def connect():
+        ftp = FakeFTP(REMOTE_FILES, fail_once=not sessions)
+        sessions.append(ftp)
+        return ftp
+
+    remote = next(iter(REMOTE_FILES))
+    spec = DownloadSpec(remote=pathlib.PureWindowsPath(remote), local=tmp_path / "adem.tx2")
+    with FTPSessionPool(connect) as pool:
+        results = list(pool.map(grab_spec, [spec]))
+
+    assert len(results) == 1
+    assert len(sessions) == 2
+    assert spec.local.read_bytes() == REMOTE_FILES[remote]
+
+
+LISTED_FILES = {
+    "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx1": b"",
+    "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.Tx2": b"",
+    "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.TxF": b"",
+    "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\tserv10.txf": b"",
+    "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\unknown.txt": b"",
+}
+
+
+def test_list_supported_files_casts_each_location_once(monkeypatch):
+    cast_calls = []
+    original_cast = ftp_module.cast_into_kinds
+
+    def counting_cast(paths, kinds):
+        cast_calls.append(len(paths))
+        return original_cast(paths, kinds)
+
+    monkeypatch.setattr(ftp_module, "cast_into_kinds", counting_cast)
+    files = ftp_module.list_supported_files(
+        FakeFTP(LISTED_FILES),  # type: ignore[arg-type]
+        months=[dt.date(2023, 10, 1)],
+        extensions=[".tx2", ".TXF"],
+        kinds=["adem", "tserv"],
+        locations=[ADEM.location],
+    )
+
+    assert len(cast_calls) == 1
+    assert sorted(str(f.path.name) for f in files) == ["adem1001.Tx2", "adem1001.TxF", "tserv10.txf"]
+
+
+def test_list_entries_in_location_with_mlsd():
+    ftp = FakeFTP(LISTED_FILES, host="mlsd.ftp", mlsd=True)
+    entries = ftp_module.list_entries_in_location(ftp, "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10")  # type: ignore[arg-type]
+
+    assert "NLST" not in ftp.commands
+    assert [e.path for e in entries] == [pathlib.PureWindowsPath(p) for p in LISTED_FILES]
+    assert all(e.size == 0 for e in entries)
+    assert all(e.modified_at == dt.datetime(2023, 11, 2, 3, 4, 5, tzinfo=dt.timezone.utc) for e in entries)
+
+
+def test_list_entries_in_location_falls_back_to_nlst():
+    ftp = FakeFTP(LISTED_FILES, host="nlst-only.ftp")
+    entries = ftp_module.list_entries_in_location(ftp, "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10")  # type: ignore[arg-type]
+
+    assert ftp.commands[-2:] == ["MLSD", "NLST"]
+    assert [e.path for e in entries] == [pathlib.PureWindowsPath(p) for p in LISTED_FILES]
+    assert all(e.size is None and e.modified_at is None for e in entries)
+
+    ftp.commands.clear()
+    ftp_module.list_entries_in_location(ftp, "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10")  # type: ignore[arg-type]
+    assert "MLSD" not in ftp.commands
+
+
+def test_listed_files_carry_size_and_modification_time():
+    files = {"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx2": b"123456"}
+    listed = ftp_module.list_supported_files(
+        FakeFTP(files, host="mlsd.ftp", mlsd=True),  # type: ignore[arg-type]
+        months=[dt.date(2023, 10, 1)],
+        extensions=[None],  # type: ignore[list-item]
+        kinds=["adem"],
+        locations=[ADEM.location],
+    )
+    assert len(listed) == 1
+    assert listed[0].size == 6
+    assert listed[0].modified_at == dt.datetime(2023, 11, 2, 3, 4, 5, tzinfo=dt.timezone.utc)
+
+
+def test_keep_latest_versions():
+    names = ["adem1001.tx1", "adem1001.txr", "adem1001.tx2", "adem1002.txa", "adem1002.tx1", "trsd1001.txf"]
+    files = {f"\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\{name}": b"" for name in names}
+    listed = ftp_module.list_supported_files(
+        FakeFTP(files),  # type: ignore[arg-type]
+        months=[dt.date(2023, 10, 1)],
+        extensions=[None],  # type: ignore[list-item]
+        kinds=["adem", "trsd"],
+        locations=[ADEM.location],
+    )
+    assert len(listed) == len(names)
+
+    latest = ftp_module.keep_latest_versions(listed)
+    assert sorted(f.path.name for f in latest) == ["adem1001.txr", "adem1002.tx1", "trsd1001.txf"]
+
+def test_synthesized_paths_round_trip():
+    files = ftp_module.synthesize_supported_files(
+        months=[dt.date(2023, 10, 1)],
+        extensions=[".tx2"],
+        kinds=["adem", "balcttos", "pme", "tserv"],
+        agent="XXXC",
+        until=dt.date(2023, 10, 3),
+    )
+    assert sorted(str(f.path) for f in files) == [
+        "\\RUTA\\PRIVADA\\XXXC\\DEL\\FTP\\2023-10\\BalCttos1001.tx2",
+        "\\RUTA\\PRIVADA\\XXXC\\DEL\\FTP\\2023-10\\BalCttos1002.tx2",
+        "\\RUTA\\PRIVADA\\XXXC\\DEL\\FTP\\2023-10\\BalCttos1003.tx2",
+        "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\PME14010.tx2",
+        "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1001.tx2",
+        "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1002.tx2",
+        "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\adem1003.tx2",
+        "\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\tserv10.tx2",
+    ]
+    # Every synthesized path is classified back as its own kind and date
+    assert {(f.kind, f.date, f.extension) for f in files if f.kind == "adem"} == {
+        ("adem", dt.date(2023, 10, d), ".tx2") for d in range(1, 4)
+    }
+
+
+def test_probe_remote_files_without_listing():
+    candidates = ftp_module.synthesize_supported_files(
+        months=[dt.date(2023, 10, 1)],
+        extensions=[".tx2", ".txf"],
+        kinds=["adem", "tserv"],
+        until=dt.date(2023, 10, 31),
+    )
+    ftp = FakeFTP(LISTED_FILES)
+    found = ftp_module.probe_remote_files(ftp, candidates)  # type: ignore[arg-type]
+
+    assert sorted((f.path.name, f.size) for f in found) == [("adem1001.tx2", 0), ("adem1001.txf", 0), ("tserv10.txf", 0)]
+    assert not any(c in ("NLST", "MLSD") or c.startswith("CWD") for c in ftp.commands)
+    assert sum(c.startswith("SIZE") for c in ftp.commands) == len(candidates) == 64
+
+def test_is_local_copy_current(tmp_path: pathlib.Path):
+    remote = next(iter(REMOTE_FILES))
+    modified_at = dt.datetime(2023, 11, 2, 3, 4, 5, tzinfo=dt.timezone.utc)
+    spec = DownloadSpec(
+        remote=pathlib.PureWindowsPath(remote),
+        local=tmp_path / "adem1001.tx2",
+        size=len(REMOTE_FILES[remote]),
+        modified_at=modified_at,
+    )
+    assert not is_local_copy_current(spec)
+
+    grab_spec(FakeFTP(REMOTE_FILES), spec)  # type: ignore[arg-type]
+    assert is_local_copy_current(spec)
+    assert not is_local_copy_current(spec.model_copy(update={"modified_at": modified_at + dt.timedelta(hours=1)}))
+    assert not is_local_copy_current(spec.model_copy(update={"size": spec.size + 1}))  # type: ignore[operator]
+    assert not is_local_copy_current(spec.model_copy(update={"size": None}))
+
+
+def test_grab_file_resumes_partial_download(tmp_path: pathlib.Path):
+    remote = pathlib.PureWindowsPath("\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\dspcttos1001.txf")
+    content = b"0123456789" * 100
+    sessions: list[FakeFTP] = []
+
+    def connect():
+        ftp = FakeFTP({str(remote): content}, fail_after=None if sessions else 300)
+        sessions.append(ftp)
+        return ftp
+
+    spec = DownloadSpec(remote=remote, local=tmp_path / "dspcttos1001.txf", size=len(content))
+    with FTPSessionPool(connect) as pool:
+        list(pool.map(grab_spec, [spec]))
+
+    assert spec.local.read_bytes() == content
+    assert not ftp_module.partial_download_path(spec.local).exists()
+    assert sessions[1].commands == ["REST 300", f"RETR {remote}"]
+
+
+def test_grab_file_discards_stale_partial_download(tmp_path: pathlib.Path):
+    remote = pathlib.PureWindowsPath("\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\aenc1001.tx2")
+    local = tmp_path / "aenc1001.tx2"
+    partial = ftp_module.partial_download_path(local)
+    content = b"new version"
+    modified_at = dt.datetime(2023, 11, 2, 3, 4, 5, tzinfo=dt.timezone.utc)
+
+    # Unknown remote size
+    partial.write_bytes(b"old")
+    ftp = FakeFTP({str(remote): content})
+    assert ftp_module.grab_file(ftp, remote, local)  # type: ignore[arg-type]
+    assert local.read_bytes() == content
+    assert ftp.commands == [f"RETR {remote}"]
+
+    # Partial written before the remote file changed
+    partial.write_bytes(b"old")
+    old = (modified_at - dt.timedelta(days=1)).timestamp()
+    os.utime(partial, (old, old))
+    ftp = FakeFTP({str(remote): content})
+    assert ftp_module.grab_file(ftp, remote, local, len(content), modified_at)  # type: ignore[arg-type]
+    assert local.read_bytes() == content
+    assert ftp.commands == [f"RETR {remote}"]
+
+    # Partial written after the remote file changed
+    partial.write_bytes(content[:3])
+    ftp = FakeFTP({str(remote): content})
+    assert ftp_module.grab_file(ftp, remote, local, len(content), modified_at)  # type: ignore[arg-type]
+    assert local.read_bytes() == content
+    assert ftp.commands == ["REST 3", f"RETR {remote}"]
+
+
+def test_grab_file_keeps_partial_until_complete(tmp_path: pathlib.Path):
+    remote = pathlib.PureWindowsPath("\\RUTA\\PUBLICA\\DEL\\FTP\\2023-10\\aenc1001.tx2")
+    local = tmp_path / "aenc1001.tx2"
+    ftp = FakeFTP({str(remote): b"abcdef"}, fail_after=2)
+    try:
+        ftp_module.grab_file(ftp, remote, local)  # type: ignore[arg-type]
+    except ConnectionResetError:
+        pass
+    assert not local.exists()
+    assert ftp_module.partial_download_path(local).read_bytes() == b"ab"
+
+
+def test_grab_spec_logs_unexpected_replies(tmp_path: pathlib.Path):
+    class ReplyErrorFTP(FakeFTP):
+        def retrbinary(self, cmd: str, callback, blocksize: int = 8192, rest=None):
+            self.commands.append(cmd)
+            raise ftplib.error_reply("226 Transfer complete")
+
+    sessions: list[FakeFTP] = []
+
+    def connect():
+        ftp = ReplyErrorFTP(REMOTE_FILES)
+        sessions.append(ftp)
+        return ftp
+
+    remote = next(iter(REMOTE_FILES))
+    spec = DownloadSpec(
+        remote=pathlib.PureWindowsPath(remote),
+        local=tmp_path / "adem1001.tx2",
+        modified_at=dt.datetime(2023, 11, 2, tzinfo=dt.timezone.utc),
+    )
+    with FTPSessionPool(connect) as pool:
+        results = list(pool.map(grab_spec, [spec]))
+
+    assert results == [(spec, None)]
+    assert len(sessions) == 1
+    assert not spec.local.exists()
+
+
+def test_grab_spec_to_memory(tmp_path: pathlib.Path):
+    remote = next(iter(REMOTE_FILES))
+    spec = DownloadSpec(remote=pathlib.PureWindowsPath(remote), local=tmp_path / "adem1001.tx2")
+    buffer = ftp_module.grab_spec_to_memory(FakeFTP(REMOTE_FILES), spec)  # type: ignore[arg-type]
+    assert buffer.read() == REMOTE_FILES[remote]
+    assert not spec.local.exists()
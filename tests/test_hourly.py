@@ -0,0 +1,94 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from asic.files.hourly import stack_hour_blocks, stack_hours
+
+HOURS = [f"HORA {h:02d}" for h in range(1, 25)]
+
+
+def legacy_stack_hours(frame: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    total = frame.set_index(keys).stack().reset_index()
+    total = total.rename(columns={f"level_{len(keys)}": "NOMBRE HORA", 0: "VALOR"})
+    total["HORA"] = (total["NOMBRE HORA"].str.slice(start=-2)).astype(int) - 1
+    total["HORA"] = pd.to_timedelta(total["HORA"], unit="h")
+    total["FECHA_HORA"] = total["FECHA"] + total["HORA"]
+    return total[["FECHA_HORA", *[k for k in keys if k != "FECHA"], "VALOR"]]
+
+
+def hourly_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.random((rows, 24))
+    values[rng.random((rows, 24)) < 0.2] = np.nan
+    values[1, :] = np.nan
+    frame = pd.DataFrame(values, columns=HOURS)
+    frame.insert(0, "AGENTE", [f"AG{i % 7}" if i % 5 else np.nan for i in range(rows)])
+    frame.insert(1, "CODIGO", [f"C{i}" for i in range(rows)])
+    return frame
+
+
+def test_stack_hours_matches_stack_for_the_file_date():
+    frame = hourly_frame(50)
+    expected = legacy_stack_hours(
+        frame.assign(FECHA=pd.Timestamp(2023, 10, 1)), ["FECHA", "AGENTE", "CODIGO"]
+    )
+    result = stack_hours(frame, ["AGENTE", "CODIGO"], date=dt.date(2023, 10, 1))
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_stack_hours_matches_stack_for_a_date_column():
+    frame = hourly_frame(50)
+    frame.insert(0, "FECHA", pd.to_datetime([f"2023-10-{1 + i % 28:02d}" for i in range(50)]))
+    keys = ["AGENTE", "CODIGO", "FECHA"]
+    result = stack_hours(frame, keys, date="FECHA")
+    pd.testing.assert_frame_equal(result, legacy_stack_hours(frame, keys))
+
+
+def test_stack_hours_subset_of_columns():
+    frame = hourly_frame(3).rename(columns={h: f"DESP_{h}" for h in HOURS})
+    frame["TRF_HORA 01"] = 1.0
+    result = stack_hours(
+        frame,
+        ["CODIGO"],
+        date=dt.date(2023, 10, 1),
+        hour_columns=["TRF_HORA 01"],
+    )
+    assert result["VALOR"].tolist() == [1.0, 1.0, 1.0]
+    assert (result["FECHA_HORA"] == pd.Timestamp(2023, 10, 1)).all()
+
+
+def test_stack_hour_blocks_matches_stack_unstack():
+    desp = hourly_frame(40).drop(columns="AGENTE")
+    trf = hourly_frame(40).drop(columns="AGENTE").sample(frac=1, random_state=1)
+    frame = desp.merge(trf, on="CODIGO", suffixes=("", "_TRF"))
+    frame = frame.rename(
+        columns={**{h: f"DESP_{h}" for h in HOURS}, **{f"{h}_TRF": f"TRF_{h}" for h in HOURS}}
+    )
+    frame.loc[3, [f"TRF_{h}" for h in HOURS]] = np.nan
+
+    stacked = frame.set_index("CODIGO").stack().reset_index()
+    stacked = stacked.rename(columns={"level_1": "NOMBRE HORA", 0: "VALOR"})
+    stacked["CONCEPTO"] = stacked["NOMBRE HORA"].str.split("_").str[0]
+    hours = pd.to_timedelta(stacked["NOMBRE HORA"].str.slice(start=-2).astype(int) - 1, unit="h")
+    stacked["FECHA_HORA"] = pd.Timestamp(2023, 10, 1) + hours
+    expected = (
+        stacked.set_index(["FECHA_HORA", "CODIGO", "CONCEPTO"])["VALOR"]
+        .unstack()
+        .reset_index()
+        .rename(columns={"DESP": "DESP_VALOR", "TRF": "TRF_VALOR"})
+    )
+    expected.columns.name = None
+
+    result = stack_hour_blocks(
+        frame,
+        ["CODIGO"],
+        date=dt.date(2023, 10, 1),
+        blocks={
+            "DESP_VALOR": [f"DESP_{h}" for h in HOURS],
+            "TRF_VALOR": [f"TRF_{h}" for h in HOURS],
+        },
+    )
+    # The pivot sorts by key within each hour, the direct layout keeps file order.
+    result = result.sort_values(["FECHA_HORA", "CODIGO"], ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,73 @@
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from asic.html_table import read_html_table
+from asic.publication import ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE, parse_monthly_pubs_table
+
+from .test_publication import PUBS_PAGE
+
+PAGES = {
+    "plain": "<table><tr><td>a</td><td>1</td></tr><tr><td>b</td><td>2</td></tr></table>",
+    "th header": "<table><tr><th>A</th><th>B</th></tr><tr><td>x</td><td>1,000</td></tr></table>",
+    "sections": (
+        "<table><thead><tr><td>A</td><td>B</td></tr></thead>"
+        "<tbody><tr><td>x</td><td>2.5</td></tr></tbody><tfoot><tr><td>t</td><td>9</td></tr></tfoot></table>"
+    ),
+    "several th header rows": (
+        "<table><tr><th>A</th><th>B</th></tr><tr><th></th><th></th></tr>"
+        "<tr><th>C</th><th>D</th></tr><tr><td>1</td><td>2</td></tr></table>"
+    ),
+    "spans": (
+        "<table><tr><td colspan=2>Title</td><td rowspan=2>R</td></tr>"
+        "<tr><td>a</td><td>b</td></tr><tr><td>c</td><td>d</td><td>e</td></tr></table>"
+    ),
+    "ragged rows": "<table><tr><td>a</td></tr><tr><td>b</td><td>c</td><td>d</td></tr></table>",
+    "unclosed tags": "<table><tr><td>a<td>b<tr><td>c<td>d</table>",
+    "entities and whitespace": (
+        "<table>\n  <tr><td>  Fecha&nbsp;de\n emisi&oacute;n </td><td><b>TX</b>F</td></tr></table>"
+    ),
+    "carriage returns": "<table>\r\n<tr><td>a\r\nb</td></tr></table><table><tr><td>x</td></tr></table>",
+    "nested tables": "<table><tr><td>outer<table><tr><td>inner</td></tr></table></td><td>o2</td></tr></table>",
+    "hidden elements": (
+        "<table><tr><td>a</td></tr><tr style='display: none'><td>h</td></tr>"
+        "<tr><td>b<span style=\"display:none\">x</span></td></tr></table>"
+        "<table style='display:none'><tr><td>z</td></tr></table><table><tr><td>q</td></tr></table>"
+    ),
+    "empty tables": (
+        "<table></table><table> <tr><td></td></tr></table>"
+        "<table>\n<tr><td>a</td></tr></table><table><tr><td>b</td></tr></table>"
+    ),
+    "quotes and separators in cells": (
+        "<table><tr><th>A, \"b\"</th><th>B</th></tr>"
+        "<tr><td>x, \"y\"</td><td>1,234.5</td></tr><tr><td>'q'</td><td>-7</td></tr></table>"
+    ),
+    "empty rows": (
+        "<table><tr><td>a</td><td>1</td></tr><tr><td></td><td></td></tr>"
+        "<tr><td></td></tr><tr><td>b</td><td>2</td></tr></table>"
+    ),
+    "header only": "<table><tr><th>A</th><th>B</th></tr></table>",
+    "missing values": (
+        "<table><tr><td>a<script>var x=1;</script></td><td>NA</td><td></td></tr>"
+        "<tr><td>b</td><td>n/a</td><td>3</td></tr></table>"
+    ),
+}
+
+
+@pytest.mark.parametrize("html", PAGES.values(), ids=PAGES.keys())
+def test_read_html_table_same_as_read_html(html: str):
+    expected = pd.read_html(StringIO(html), flavor="html5lib")
+    for i, table in enumerate(expected):
+        pd.testing.assert_frame_equal(read_html_table(html, i), table)
+    with pytest.raises(IndexError):
+        read_html_table(html, len(expected))
+
+
+def test_parse_monthly_pubs_table_same_as_read_html():
+    service = ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE
+    tables = pd.read_html(PUBS_PAGE, flavor="html5lib", encoding=service["encoding"])  # type: ignore[arg-type]
+    expected = tables[service["table-index"]].dropna().T.drop_duplicates().T
+    expected = pd.DataFrame(expected.values[1:], columns=expected.iloc[0])
+
+    pd.testing.assert_frame_equal(parse_monthly_pubs_table(PUBS_PAGE), expected)
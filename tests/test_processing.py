@@ -0,0 +1,110 @@
+import pathlib
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from asic.files.definitions.adem import ADEM
+from asic.files.definitions.tgrl import TGRL
+from asic.processing import (
+    PreprocessingPool,
+    list_local_files,
+    mirror_path,
+    preprocessed_path,
+    write_preprocessed,
+)
+
+from .conftest import ALL_FILES, TESTFILES
+
+
+@pytest.fixture
+def adem_file() -> ADEM:
+    return ADEM.from_remote_path(pathlib.PureWindowsPath(str(ALL_FILES["adem"]["path"])))
+
+
+
+def test_local_layout(adem_file: ADEM, tmp_path: pathlib.Path):
+    month_dir = tmp_path / "RUTA" / "PUBLICA" / "DEL" / "FTP" / "2023-10"
+    assert mirror_path(adem_file, tmp_path) == month_dir / "adem1001.Tx2"
+    assert preprocessed_path(adem_file, tmp_path) == month_dir / "001" / "adem1001.csv"
+
+
+@TESTFILES
+def test_list_local_files(datafiles: pathlib.Path):
+    files = list_local_files(datafiles)
+    assert {f.kind.lower() for f, _ in files} == {k.lower() for k in ALL_FILES}
+    assert all(local.is_file() for _, local in files)
+
+    adem_files = list_local_files(datafiles, kinds=["adem"])
+    assert [(f.path, local) for f, local in adem_files] == [
+        (
+            pathlib.PureWindowsPath(str(ALL_FILES["adem"]["path"])),
+            mirror_path(adem_files[0][0], datafiles),
+        )
+    ]
+
+
+@TESTFILES
+def test_list_local_files_skips_partial_downloads(datafiles: pathlib.Path):
+    month_dir = datafiles / "RUTA" / "PUBLICA" / "DEL" / "FTP" / "2023-10"
+    partial = month_dir / "trsd1002.tx2.part"
+    partial.write_bytes(b"CODIGO;CONTENIDO;HORA 01\n")
+
+    assert all(local != partial for _, local in list_local_files(datafiles))
+    assert len(list_local_files(datafiles, kinds=["trsd"])) == 1
+
+
+@TESTFILES
+def test_write_preprocessed_from_bytes_in_worker_process(
+    adem_file: ADEM, datafiles: pathlib.Path, tmp_path: pathlib.Path
+):
+    local = datafiles / adem_file.path.relative_to(adem_file.path.anchor)
+    with PreprocessingPool(processes=2) as pool:
+        pool.submit(write_preprocessed, adem_file, local.read_bytes(), tmp_path, True)
+    assert pool.completed == 1
+
+    written = preprocessed_path(adem_file, tmp_path)
+    assert len(pd.read_csv(written, encoding="utf-8-sig")) == 1536
+
+
+def test_submit_blocks_when_max_pending_reached():
+    pool = PreprocessingPool(processes=1, max_pending=1)
+    pool.submit(time.sleep, 0.3)
+    submitted = threading.Event()
+
+    def submit_second():
+        pool.submit(time.sleep, 0)
+        submitted.set()
+
+    thread = threading.Thread(target=submit_second)
+    thread.start()
+    assert not submitted.wait(0.1)
+    assert submitted.wait(5)
+    thread.join()
+    pool.join()
+    assert pool.completed == 2
+
+
+def test_join_raises_worker_errors(tmp_path: pathlib.Path, adem_file: ADEM):
+    pool = PreprocessingPool(processes=1)
+    pool.submit(write_preprocessed, adem_file, tmp_path / "missing.tx2", tmp_path, True)
+    with pytest.raises(FileNotFoundError):
+        pool.join()
+
+
+@TESTFILES
+def test_write_preprocessed_in_chunks(datafiles: pathlib.Path, tmp_path: pathlib.Path):
+    tgrl_path = pathlib.PureWindowsPath(str(ALL_FILES["tgrl"]["path"]))
+    tgrl_file = TGRL.from_remote_path(tgrl_path)
+    local = datafiles / tgrl_path.relative_to(tgrl_path.anchor)
+
+    whole = write_preprocessed(tgrl_file, local, tmp_path / "whole", True)
+    chunked = write_preprocessed(tgrl_file, local, tmp_path / "chunked", True, chunksize=100)
+    assert chunked.read_bytes() == whole.read_bytes()
+    assert list(chunked.parent.glob("*.part")) == []
+
+
+def test_write_preprocessed_requires_the_directory(adem_file: ADEM, tmp_path: pathlib.Path):
+    with pytest.raises(FileNotFoundError, match="--prepro-dirs"):
+        write_preprocessed(adem_file, b"", tmp_path)
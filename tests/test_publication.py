@@ -0,0 +1,133 @@
+import datetime as dt
+import pathlib
+
+import httpx
+import pandas as pd
+
+import asic.publication as publication_module
+from asic.cache import ListingCache, PageCache
+from asic.files.definitions.adem import ADEM
+from asic.files.definitions.aenc import AENC
+from asic.ftp import list_target_files
+from asic.publication import (
+    ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE,
+    ASICVersionPublication,
+    DownloadTarget,
+    get_monthly_pubs_table,
+    plan_publication_targets,
+)
+
+from .conftest import FakeFTP
+
+
+def publication(month: str, version: str) -> ASICVersionPublication:
+    return ASICVersionPublication(
+        month=dt.datetime.strptime(month, "%Y-%m-%d"), version=version, published_at=dt.datetime(2023, 11, 5)
+    )
+
+
+PUBLICATIONS = [
+    publication("2023-10-01", "txf"),
+    publication("2023-09-01", "tx3"),
+    publication("2023-10-01", "tx2"),
+    # Daily versions carry the published day
+    publication("2023-10-30", "tx1"),
+]
+
+
+def test_plan_publication_targets():
+    targets = plan_publication_targets(PUBLICATIONS, [ADEM.location, AENC.location, ADEM.location], agent="XXXC")
+    assert targets == [
+        DownloadTarget("/RUTA/PRIVADA/XXXC/DEL/FTP/2023-10/", dt.date(2023, 10, 1), (".tx1", ".tx2", ".txf")),
+        DownloadTarget("/RUTA/PUBLICA/DEL/FTP/2023-10/", dt.date(2023, 10, 1), (".tx1", ".tx2", ".txf")),
+        DownloadTarget("/RUTA/PRIVADA/XXXC/DEL/FTP/2023-09/", dt.date(2023, 9, 1), (".tx3",)),
+        DownloadTarget("/RUTA/PUBLICA/DEL/FTP/2023-09/", dt.date(2023, 9, 1), (".tx3",)),
+    ]
+
+
+def test_list_target_files_refreshes_only_targets(tmp_path: pathlib.Path):
+    files = {
+        f"\\RUTA\\PUBLICA\\DEL\\FTP\\{month}\\adem{month[-2:]}01.{ext}": b""
+        for month in ["2023-08", "2023-09", "2023-10"]
+        for ext in ["tx1", "tx2", "txr", "txf", "tx3"]
+    }
+    ftp = FakeFTP(files)
+    cache = ListingCache.in_dir(tmp_path)
+    # Listed before the TXF was published
+    cache.put(ftp.host, "/RUTA/PUBLICA/DEL/FTP/2023-10/", ["adem1001.tx1", "adem1001.tx2"])
+
+    targets = plan_publication_targets([publication("2023-10-01", "txf")], [ADEM.location])
+    listed = list_target_files(ftp, targets, kinds=["adem"], cache=cache)  # type: ignore[arg-type]
+
+    assert [f.path.name for f in listed] == ["adem1001.txf"]
+    assert [c for c in ftp.commands if c.startswith("CWD")] == ["CWD /RUTA/PUBLICA/DEL/FTP/2023-10/"]
+
+
+PUBS_PAGE = """<html><head><title>Versiones liquidadas</title></head><body>
+<table><tr><td>Liquidación</td><td><a href="#">Inicio</a></td></tr></table>
+<table border="1">
+<tr><td>MES LIQUIDADO</td><td>ULTIMA VERSION LIQUIDADA</td><td>FECHA DE EMISIÓN/PUBLICACIÓN</td></tr>
+<tr><td>Sep 2023</td><td>TXF</td><td>2023-11-02</td></tr>
+<tr><td>Aug 2023</td><td>TX3</td><td>2023-10-30</td></tr>
+<tr><td>Sep 2023</td><td>TXR</td><td>2023-10-25</td></tr>
+</table></body></html>""".encode("cp1252")
+
+
+class FakePubsServer:
+    """Serves `page`, answering 304 to a matching `If-None-Match` when `etag` is set."""
+
+    def __init__(self, page: bytes, etag: str | None = None):
+        self.page = page
+        self.etag = etag
+        self.requests: list[dict] = []
+
+    def get(self, url: str, headers: dict, verify: bool = True) -> httpx.Response:
+        self.requests.append(dict(headers))
+        request = httpx.Request("GET", url)
+        if self.etag is not None and headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, request=request)
+        response_headers = {"ETag": self.etag} if self.etag is not None else {}
+        return httpx.Response(200, content=self.page, headers=response_headers, request=request)
+
+
+def count_parses(monkeypatch) -> list[int]:
+    parses = []
+    parse = publication_module.parse_monthly_pubs_table
+
+    def counting_parse(content: bytes) -> pd.DataFrame:
+        parses.append(len(content))
+        return parse(content)
+
+    monkeypatch.setattr(publication_module, "parse_monthly_pubs_table", counting_parse)
+    return parses
+
+
+def test_pubs_page_revalidated_with_etag(tmp_path: pathlib.Path, monkeypatch):
+    server = FakePubsServer(PUBS_PAGE, etag='"v1"')
+    monkeypatch.setattr(publication_module.httpx, "get", server.get)
+    parses = count_parses(monkeypatch)
+    cache = PageCache.in_dir(tmp_path)
+
+    first = get_monthly_pubs_table(cache)
+    second = get_monthly_pubs_table(cache)
+
+    pd.testing.assert_frame_equal(first, second, check_names=False)
+    assert list(second) == list(ASIC_MONTHLY_VERSION_PUBLICATION_SERVICE["table_cols"].values())
+    assert len(parses) == 1
+    assert "If-None-Match" not in server.requests[0]
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+
+
+def test_pubs_page_parsed_only_when_content_changes(tmp_path: pathlib.Path, monkeypatch):
+    server = FakePubsServer(PUBS_PAGE)
+    monkeypatch.setattr(publication_module.httpx, "get", server.get)
+    parses = count_parses(monkeypatch)
+    cache = PageCache.in_dir(tmp_path)
+
+    get_monthly_pubs_table(cache)
+    get_monthly_pubs_table(cache)
+    assert len(parses) == 1
+
+    server.page = PUBS_PAGE.replace(b"</table></body>", b"<tr><td>Oct 2023</td><td>TX2</td><td>2023-11-05</td></tr></table></body>")
+    assert len(get_monthly_pubs_table(cache)) == 4
+    assert len(parses) == 2
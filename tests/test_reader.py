@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+from asic.reader import NUMERIC_POLICY_ENVVAR, FileReader, NumericPolicy
+
+FILE_DEF = {
+    "type": "csv",
+    "sep": ";",
+    "dt_fields": {},
+    "dtype": {"AGENTE": "category", "VALOR": float, "MAGNITUD": int},
+}
+
+CONTENT = b"AGENTE;VALOR;MAGNITUD;EXTRA\nAAAA;1.5;10;2.5\nBBBB;;20;3.5\n"
+
+
+@pytest.mark.parametrize(
+    "policy,expected",
+    [
+        (NumericPolicy.FLOAT64, {"VALOR": "float64", "MAGNITUD": "int64", "EXTRA": "float64"}),
+        (NumericPolicy.FLOAT32, {"VALOR": "float32", "MAGNITUD": "int64", "EXTRA": "float32"}),
+        (NumericPolicy.NULLABLE, {"VALOR": "float64", "MAGNITUD": "Int64", "EXTRA": "float64"}),
+    ],
+)
+def test_read_numeric_policy(policy: NumericPolicy, expected: dict):
+    reader = FileReader(FILE_DEF)
+    data = reader.read(io.BytesIO(CONTENT), numeric_policy=policy)
+    assert {c: str(data[c].dtype) for c in expected} == expected
+    assert str(data["AGENTE"].dtype) == "category"
+
+    chunk = next(reader.read_iter(io.BytesIO(CONTENT), chunksize=1, numeric_policy=policy))
+    assert {c: str(chunk[c].dtype) for c in expected} == expected
+
+
+def test_read_numeric_policy_from_env(monkeypatch):
+    monkeypatch.setenv(NUMERIC_POLICY_ENVVAR, "FLOAT32")
+    data = FileReader(FILE_DEF).read(io.BytesIO(CONTENT))
+    assert str(data["VALOR"].dtype) == "float32"
+
+
+def test_nullable_integers_allow_missing_values():
+    content = b"AGENTE;VALOR;MAGNITUD\nAAAA;1.5;\n"
+    with pytest.raises(ValueError):
+        FileReader(FILE_DEF).read(io.BytesIO(content), numeric_policy=NumericPolicy.FLOAT64)
+    data = FileReader(FILE_DEF).read(io.BytesIO(content), numeric_policy=NumericPolicy.NULLABLE)
+    assert data["MAGNITUD"].isna().all()
+
+
+@pytest.mark.parametrize(
+    "policy,expected",
+    [(NumericPolicy.FLOAT64, "float64"), (NumericPolicy.FLOAT32, "float32"), (NumericPolicy.NULLABLE, "float64")],
+)
+def test_read_undeclared_dtype(policy: NumericPolicy, expected: str):
+    reader = FileReader({**FILE_DEF, "undeclared_dtype": float})
+    content = b"AGENTE;VALOR;MAGNITUD;EXTRA\nAAAA;1.5;10;2\nBBBB;;20;3\n"
+    data = reader.read(io.BytesIO(content), numeric_policy=policy)
+    assert str(data["EXTRA"].dtype) == expected
+
+    chunk = next(reader.read_iter(io.BytesIO(content), chunksize=1, numeric_policy=policy))
+    assert str(chunk["EXTRA"].dtype) == expected
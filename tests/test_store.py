@@ -0,0 +1,92 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asic.files.definitions.trsd import TRSD
+from asic.files.definitions.tserv import TSERV
+from asic.processing import OutputFormat, list_local_files, write_preprocessed
+from asic.reader import NUMERIC_POLICY_ENVVAR
+from asic.store import ColumnarStore
+
+from .conftest import ALL_FILES, TESTFILES
+
+
+def as_stored(frame: pd.DataFrame) -> pd.DataFrame:
+    """Strings come back dictionary encoded as categoricals."""
+    return frame.astype({c: "category" for c in frame.columns if frame[c].dtype == object})
+
+
+@TESTFILES
+@pytest.mark.parametrize("policy", ["float64", "float32", "nullable"])
+def test_store_round_trip(datafiles: pathlib.Path, tmp_path: pathlib.Path, monkeypatch, policy):
+    monkeypatch.setenv(NUMERIC_POLICY_ENVVAR, policy)
+    store = ColumnarStore(tmp_path)
+    for f, local in list_local_files(datafiles):
+        expected = f.preprocess(local)
+        part = write_preprocessed(f, local, tmp_path, output_format=OutputFormat.COLUMNAR)
+        assert part == store.part_path(f)
+
+        stored = store.read_part(part)
+        pd.testing.assert_frame_equal(stored.copy(), as_stored(expected), check_categorical=False)
+
+
+@TESTFILES
+def test_store_reads_memory_mapped_partitions(datafiles: pathlib.Path, tmp_path: pathlib.Path):
+    store = ColumnarStore(tmp_path)
+    files = list_local_files(datafiles, kinds=["trsd"])
+    for f, local in files:
+        store.write(f, f.preprocess(local))
+
+    (f, _), = files
+    assert store.parts("trsd", 2023, 10) == [tmp_path / "trsd" / "2023" / "10" / "001" / "trsd1001"]
+    assert store.parts("trsd", 2023, 11) == []
+
+    prices = store.read("trsd", year=2023, columns=["FECHA_HORA", "PRECIO"])
+    assert list(prices.columns) == ["FECHA_HORA", "PRECIO"]
+    assert len(prices) == 720
+    assert isinstance(prices["PRECIO"].to_numpy().base, np.memmap)
+
+    # Writing again replaces the part
+    store.write(f, f.preprocess(files[0][1]).head(24))
+    assert len(store.read("trsd")) == 24
+
+
+def test_store_masked_columns(tmp_path: pathlib.Path):
+    tserv = TSERV.from_remote_path(pathlib.PureWindowsPath(str(ALL_FILES["tserv"]["path"])))
+    frame = pd.DataFrame(
+        {
+            "AGENTE": pd.Categorical(["AAAA", None, "BBBB"]),
+            "CONCEPTO": ["X", "Y", None],
+            "VALOR": pd.array([1, None, 3], dtype="Int64"),
+        }
+    )
+    store = ColumnarStore(tmp_path)
+    stored = store.read_part(store.write(tserv, frame))
+    pd.testing.assert_frame_equal(stored, as_stored(frame), check_categorical=False)
+
+
+def test_store_read_concatenates_parts(tmp_path: pathlib.Path):
+    store = ColumnarStore(tmp_path)
+    days: list[tuple[str, list[str | None]]] = [("01", ["AAAA", "BBBB"]), ("02", ["CCCC", None])]
+    for day, agents in days:
+        trsd = TRSD.from_remote_path(pathlib.PureWindowsPath(f"/RUTA/PUBLICA/DEL/FTP/2023-10/trsd10{day}.tx2"))
+        frame = pd.DataFrame(
+            {
+                "AGENTE": pd.Categorical(agents),
+                "VALOR": pd.array([1, None], dtype="Int64"),
+                "PRECIO": [1.5, 2.5],
+            }
+        )
+        store.write(trsd, frame)
+
+    total = store.read("trsd", year=2023, month=10)
+    expected = pd.DataFrame(
+        {
+            "AGENTE": pd.Categorical(["AAAA", "BBBB", "CCCC", None]),
+            "VALOR": pd.array([1, None, 1, None], dtype="Int64"),
+            "PRECIO": [1.5, 2.5, 1.5, 2.5],
+        }
+    )
+    pd.testing.assert_frame_equal(total, expected)
@@ -1,5 +1,6 @@
 import pathlib
 
+import pandas as pd
 from pytest import fixture
 
 from asic.files.definitions.tgrl import TGRL
@@ -39,3 +40,16 @@ def test_tgrl_read(tgrl_file: TGRL, local_tgrl_file):
 def test_tgrl_preprocess(tgrl_file: TGRL, local_tgrl_file):
     long_data = tgrl_file.preprocess(local_tgrl_file)
     assert len(long_data) == 91488
+
+
+@TESTFILES
+def test_tgrl_preprocess_categorical_keys(tgrl_file: TGRL, local_tgrl_file):
+    long_data = tgrl_file.preprocess(local_tgrl_file)
+    keys = ["AGENTE", "CODIGO", "CONTENIDO"]
+    assert all(isinstance(long_data[k].dtype, pd.CategoricalDtype) for k in keys)
+
+    as_objects = long_data.astype(dict.fromkeys(keys, object))
+    assert (
+        long_data.memory_usage(deep=True).sum()
+        < as_objects.memory_usage(deep=True).sum() / 5
+    )